@@ -16,6 +16,17 @@ config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
 
 target_metadata = Base.metadata
 
+# Database-maintained columns that are deliberately left out of the models.
+UNMAPPED_COLUMNS = {("sessions", "search_vector")}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == "column" and (object.table.name, name) in UNMAPPED_COLUMNS:
+        return False
+    if type_ == "index" and name == "ix_sessions_search_vector":
+        return False
+    return True
+
 
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
@@ -24,6 +35,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -38,7 +50,11 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
@@ -0,0 +1,32 @@
+"""sessions user start_time index
+
+Revision ID: 3f9c1a7d2b84
+Revises: 74804068745f
+Create Date: 2026-10-18 10:12:41.512093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c1a7d2b84'
+down_revision: Union[str, Sequence[str], None] = '74804068745f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_sessions_user_id_start_time',
+        'sessions',
+        ['user_id', sa.text('start_time DESC')],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_sessions_user_id_start_time', table_name='sessions')
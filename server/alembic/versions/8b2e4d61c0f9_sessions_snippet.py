@@ -0,0 +1,34 @@
+"""sessions snippet
+
+Revision ID: 8b2e4d61c0f9
+Revises: 3f9c1a7d2b84
+Create Date: 2026-10-18 11:03:17.284551
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e4d61c0f9'
+down_revision: Union[str, Sequence[str], None] = '3f9c1a7d2b84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('sessions', sa.Column('snippet', sa.String(length=200), nullable=True))
+    # New rows get the snippet from the ORM; existing rows take a plain prefix.
+    op.execute(
+        "UPDATE sessions SET snippet = CASE "
+        "WHEN char_length(final_transcript) <= 160 THEN final_transcript "
+        "ELSE left(final_transcript, 159) || '…' END"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('sessions', 'snippet')
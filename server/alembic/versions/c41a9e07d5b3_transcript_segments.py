@@ -0,0 +1,38 @@
+"""transcript segments
+
+Revision ID: c41a9e07d5b3
+Revises: 8b2e4d61c0f9
+Create Date: 2026-10-18 12:21:40.918306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41a9e07d5b3'
+down_revision: Union[str, Sequence[str], None] = '8b2e4d61c0f9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('transcript_segments',
+    sa.Column('session_id', sa.UUID(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('start', sa.Float(), nullable=False),
+    sa.Column('end', sa.Float(), nullable=False),
+    sa.Column('text', sa.Text(), nullable=False),
+    sa.Column('language', sa.String(length=10), nullable=True),
+    sa.Column('confidence', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['session_id'], ['sessions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('session_id', 'position')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('transcript_segments')
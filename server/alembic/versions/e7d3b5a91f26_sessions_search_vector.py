@@ -0,0 +1,39 @@
+"""sessions search vector
+
+Revision ID: e7d3b5a91f26
+Revises: c41a9e07d5b3
+Create Date: 2026-10-18 13:47:05.630217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7d3b5a91f26'
+down_revision: Union[str, Sequence[str], None] = 'c41a9e07d5b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Generated by Postgres on every insert and update; not mapped in the ORM.
+    op.execute(
+        "ALTER TABLE sessions ADD COLUMN search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('english', final_transcript)) STORED"
+    )
+    op.create_index(
+        'ix_sessions_search_vector',
+        'sessions',
+        ['search_vector'],
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_sessions_search_vector', table_name='sessions')
+    op.drop_column('sessions', 'search_vector')
@@ -0,0 +1,59 @@
+import json
+import os
+import platform
+import subprocess
+import tempfile
+from datetime import UTC, datetime
+from typing import Optional
+
+# Point the app at a throwaway SQLite file before anything imports db.base.
+_db_fd, DB_PATH = tempfile.mkstemp(suffix=".db")
+os.close(_db_fd)
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+
+def percentiles(samples: list[float]) -> dict:
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1000, 2)
+
+    return {
+        "count": len(ordered),
+        "p50_ms": pick(0.5),
+        "p90_ms": pick(0.9),
+        "p99_ms": pick(0.99),
+    }
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def write_results(results: dict, output: Optional[str]) -> None:
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if output is None:
+        print(text)
+        return
+    with open(output, "w") as f:
+        f.write(text + "\n")
+
+
+def remove_database() -> None:
+    os.remove(DB_PATH)
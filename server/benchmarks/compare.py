@@ -0,0 +1,71 @@
+"""Compare two benchmark result files:
+
+    python -m benchmarks.compare before.json after.json
+
+Prints every numeric result that differs, with its relative change.
+Environment metadata is skipped.
+"""
+
+import argparse
+import json
+
+
+def flatten(value, prefix: str = "") -> dict[str, float]:
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, list):
+        # Runs are keyed by their session count, buckets by their offset.
+        items = (
+            (
+                (
+                    str(item.get("sessions", item.get("session_seconds", index)))
+                    if isinstance(item, dict)
+                    else str(index)
+                ),
+                item,
+            )
+            for index, item in enumerate(value)
+        )
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {prefix: value}
+    else:
+        return {}
+    flat = {}
+    for key, item in items:
+        flat.update(flatten(item, f"{prefix}.{key}" if prefix else key))
+    return flat
+
+
+def compare(before: dict, after: dict) -> list[str]:
+    old = flatten({k: v for k, v in before.items() if k != "environment"})
+    new = flatten({k: v for k, v in after.items() if k != "environment"})
+    lines = []
+    for key in sorted(old.keys() | new.keys()):
+        a, b = old.get(key), new.get(key)
+        if a == b:
+            continue
+        if a is None or b is None:
+            lines.append(f"{key}: {a} -> {b}")
+        elif a == 0:
+            lines.append(f"{key}: {a} -> {b}")
+        else:
+            lines.append(f"{key}: {a} -> {b} ({(b - a) / abs(a):+.1%})")
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+    for line in compare(before, after):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Synthetic audio fixtures for the websocket benchmarks.
+
+Writes seeded, speech-like WebM/Opus recordings (voiced bursts of varying
+pitch separated by pauses, so the VAD endpoints them like real speech) and
+a manifest, so every machine replays byte-identical input:
+
+    python -m benchmarks.fixtures --seconds 30 60 300
+"""
+
+import argparse
+import io
+import json
+import os
+
+import av
+import numpy as np
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+MANIFEST = "manifest.json"
+ENCODE_RATE = 48000
+
+
+def synthesize(seconds: float, seed: int, rate: int = ENCODE_RATE) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    signal = np.zeros(int(seconds * rate), dtype=np.float32)
+    position = 0
+    while position < len(signal):
+        burst = int(rng.uniform(0.5, 2.5) * rate)
+        t = np.arange(min(burst, len(signal) - position)) / rate
+        pitch = rng.uniform(90, 250)
+        envelope = 0.5 + 0.5 * np.sin(2 * np.pi * rng.uniform(3, 6) * t)
+        harmonics = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+        signal[position : position + len(t)] = 0.15 * envelope * harmonics
+        position += burst + int(rng.uniform(0.2, 0.8) * rate)
+    return signal
+
+
+def encode(signal: np.ndarray, rate: int = ENCODE_RATE) -> bytes:
+    output = io.BytesIO()
+    with av.open(output, mode="w", format="webm") as container:
+        stream = container.add_stream("libopus", rate=rate)
+        stream.layout = "mono"
+        for i in range(0, len(signal), 960):
+            frame = av.AudioFrame.from_ndarray(
+                signal[i : i + 960].reshape(1, -1), format="flt", layout="mono"
+            )
+            frame.sample_rate = rate
+            for packet in stream.encode(frame):
+                container.mux(packet)
+        for packet in stream.encode(None):
+            container.mux(packet)
+    return output.getvalue()
+
+
+def fixture_name(seconds: float) -> str:
+    return f"speech-{seconds:g}s"
+
+
+def load(name: str, directory: str = FIXTURES_DIR) -> tuple[bytes, float]:
+    try:
+        with open(os.path.join(directory, MANIFEST)) as f:
+            entry = json.load(f)[name]
+    except (FileNotFoundError, KeyError):
+        raise SystemExit(
+            f"Fixture {name!r} not found; generate it with python -m benchmarks.fixtures"
+        )
+    with open(os.path.join(directory, entry["file"]), "rb") as f:
+        return f.read(), entry["seconds"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, nargs="+", default=[30, 120])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=FIXTURES_DIR)
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    manifest_path = os.path.join(args.out, MANIFEST)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    for seconds in args.seconds:
+        name = fixture_name(seconds)
+        data = encode(synthesize(seconds, args.seed))
+        with open(os.path.join(args.out, f"{name}.webm"), "wb") as f:
+            f.write(data)
+        manifest[name] = {
+            "file": f"{name}.webm",
+            "seconds": seconds,
+            "seed": args.seed,
+            "bytes": len(data),
+        }
+        print(f"{name}: {len(data)} bytes")
+
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Login storm benchmark.
+
+Fires concurrent logins at an in-process app while a probe keeps hitting a
+cheap endpoint, then writes latency percentiles for both as JSON:
+
+    python -m benchmarks.login_load --concurrency 64 --requests 512
+"""
+
+import argparse
+import asyncio
+import time
+
+# Must come first: points DATABASE_URL at a throwaway database.
+from benchmarks.common import environment, percentiles, remove_database, write_results
+
+import httpx
+
+from db.base import Base, async_engine, engine
+from lib.config import settings
+from lib.hashing import stop_password_hasher
+from main import app
+
+
+async def run(args: argparse.Namespace) -> dict:
+    credentials = {"email": "bench@example.com", "password": "password"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        await client.post("/auth/signup", json=credentials)
+
+        login_latencies: list[float] = []
+        probe_latencies: list[float] = []
+        statuses: dict[int, int] = {}
+        remaining = args.requests
+        done = asyncio.Event()
+
+        async def login_client():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                response = await client.post("/auth/login", json=credentials)
+                statuses[response.status_code] = (
+                    statuses.get(response.status_code, 0) + 1
+                )
+                if response.status_code == 200:
+                    login_latencies.append(time.perf_counter() - started)
+
+        async def probe():
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/health/live")
+                probe_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(args.probe_interval)
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(login_client() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+
+    await async_engine.dispose()
+
+    return {
+        "environment": environment(),
+        "config": {
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+            "hash_workers": settings.PASSWORD_HASH_WORKERS,
+            "hash_max_queue": settings.PASSWORD_HASH_MAX_QUEUE,
+            "hash_processes": settings.PASSWORD_HASH_USE_PROCESSES,
+        },
+        "elapsed_seconds": round(elapsed, 3),
+        "statuses": statuses,
+        "login": percentiles(login_latencies),
+        "probe": percentiles(probe_latencies),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=256)
+    parser.add_argument("--probe-interval", type=float, default=0.01)
+    parser.add_argument("--rounds", type=int, default=settings.BCRYPT_ROUNDS)
+    parser.add_argument("--workers", type=int, default=settings.PASSWORD_HASH_WORKERS)
+    parser.add_argument(
+        "--max-queue", type=int, default=settings.PASSWORD_HASH_MAX_QUEUE
+    )
+    parser.add_argument("--threads", action="store_true")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    settings.BCRYPT_ROUNDS = args.rounds
+    settings.PASSWORD_HASH_WORKERS = args.workers
+    settings.PASSWORD_HASH_MAX_QUEUE = args.max_queue
+    settings.PASSWORD_HASH_USE_PROCESSES = not args.threads
+
+    Base.metadata.create_all(bind=engine)
+    try:
+        write_results(asyncio.run(run(args)), args.output)
+    finally:
+        stop_password_hasher()
+        remove_database()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""Websocket transcription load test.
+
+Serves the app with uvicorn on a loopback port in a background thread and
+replays a fixture (see benchmarks.fixtures) into /ws/transcribe from
+concurrent client sessions, once per entry in --sessions. Results are
+written as JSON so runs can be diffed with benchmarks.compare:
+
+    python -m benchmarks.fixtures --seconds 60
+    python -m benchmarks.ws_load --fixture speech-60s --sessions 1 2 4 8
+
+Each run reports:
+
+- tick latency: traced inference spans, bucketed by how far into the
+  session they ran;
+- partial latency: time from sending the chunk that contains an audio
+  position to receiving the first delta whose segments reach it;
+- real-time factor: wall time from first chunk to final message over the
+  replayed audio duration. It includes the final pass over the open window,
+  so a session that keeps up sits just above 1; capacity is the largest
+  session count whose worst session stays within 1 + --rtf-slack. Longer
+  fixtures make the final pass matter less.
+
+Without --model, the fake transcription engine stands in for the model,
+costing --cost seconds per second of audio, so the numbers isolate the
+server's own overhead and scheduling while still going through the engine
+registry and executors. With --model the named tier is loaded as usual.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import socket
+import threading
+import time
+from bisect import bisect_left
+
+# Must come first: points DATABASE_URL at a throwaway database.
+from benchmarks.common import environment, percentiles, remove_database, write_results
+
+import httpx
+import msgpack
+import uvicorn
+from websockets.asyncio.client import connect
+
+from benchmarks.fixtures import FIXTURES_DIR, load
+from db.base import Base, async_engine, engine
+from lib.admission import session_admission
+from lib.config import settings
+from lib.protocol import MSGPACK_V1
+from lib.tracing import tracer
+from main import app
+
+
+class Server:
+    def __init__(self):
+        self._socket = socket.socket()
+        self._socket.bind(("127.0.0.1", 0))
+        self.port = self._socket.getsockname()[1]
+        self._server = uvicorn.Server(
+            uvicorn.Config(app, log_level="warning", ws="websockets")
+        )
+        self._thread = threading.Thread(target=asyncio.run, args=(self._serve(),))
+
+    def __enter__(self) -> "Server":
+        self._thread.start()
+        while not self._server.started:
+            if not self._thread.is_alive():
+                raise RuntimeError("Server failed to start")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.should_exit = True
+        self._thread.join()
+
+    async def _serve(self) -> None:
+        try:
+            await self._server.serve(sockets=[self._socket])
+        finally:
+            await async_engine.dispose()
+
+
+async def signup(port: int) -> str:
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+        response = await client.post(
+            "/auth/signup", json={"email": "bench@example.com", "password": "pw"}
+        )
+        return response.json()["data"]["access_token"]
+
+
+async def run_session(
+    url: str, data: bytes, seconds: float, pace: float, chunk_ms: int
+) -> dict:
+    count = max(1, math.ceil(seconds * 1000 / chunk_ms))
+    size = math.ceil(len(data) / count)
+    chunks = [data[i : i + size] for i in range(0, len(data), size)]
+    # Opus is close to constant bitrate, so byte offsets map linearly to time.
+    positions = [(i + 1) / len(chunks) * seconds for i in range(len(chunks))]
+    sent_at: list[float] = []
+    latencies: list[float] = []
+
+    async with connect(url, subprotocols=[MSGPACK_V1], max_size=None) as ws:
+        session = msgpack.unpackb(await ws.recv())
+        if session["type"] != "session":
+            raise RuntimeError(f"Session not started: {session}")
+
+        async def receive() -> dict:
+            covered = 0.0
+            async for raw in ws:
+                message = msgpack.unpackb(raw)
+                if message["type"] == "final":
+                    return message
+                if message["type"] != "delta":
+                    continue
+                segments = message["committed"] + message["tentative"]
+                end = max((segment[1] for segment in segments), default=0.0)
+                index = bisect_left(positions, end)
+                if end > covered and index < len(sent_at):
+                    latencies.append(time.perf_counter() - sent_at[index])
+                    covered = end
+            raise RuntimeError("Connection closed before the final message")
+
+        receiver = asyncio.create_task(receive())
+        started = time.perf_counter()
+        for chunk, position in zip(chunks, positions):
+            if pace > 0:
+                await asyncio.sleep(started + position / pace - time.perf_counter())
+            await ws.send(chunk)
+            sent_at.append(time.perf_counter())
+        await ws.send(json.dumps({"type": "stop"}))
+        await receiver
+        elapsed = time.perf_counter() - started
+
+    return {
+        "session_id": session["session_id"],
+        "elapsed": elapsed,
+        "latencies": latencies,
+    }
+
+
+def tick_latency(session_ids: list[str], bucket_seconds: float) -> list[dict]:
+    buckets: dict[int, list[tuple[float, float]]] = {}
+    for session_id in session_ids:
+        trace = tracer.get(session_id)
+        if trace is None:
+            continue
+        for event in trace.events:
+            if event["name"] != "inference":
+                continue
+            bucket = int(event["ts"] / 1e6 // bucket_seconds)
+            buckets.setdefault(bucket, []).append(
+                (event["dur"] / 1e6, event["args"]["window_seconds"])
+            )
+    return [
+        {
+            "session_seconds": bucket * bucket_seconds,
+            "window_seconds_mean": round(sum(w for _, w in samples) / len(samples), 2),
+            **percentiles([d for d, _ in samples]),
+        }
+        for bucket, samples in sorted(buckets.items())
+    ]
+
+
+async def run_level(args, port: int, token: str, data: bytes, seconds: float, n: int):
+    url = f"ws://127.0.0.1:{port}/ws/transcribe?token={token}&trace=true"
+    sessions = await asyncio.gather(
+        *(run_session(url, data, seconds, args.pace, args.chunk_ms) for _ in range(n))
+    )
+    replayed = seconds / args.pace if args.pace > 0 else seconds
+    rtf = [s["elapsed"] / replayed for s in sessions]
+    return {
+        "sessions": n,
+        "real_time_factor": {
+            "mean": round(sum(rtf) / len(rtf), 3),
+            "max": round(max(rtf), 3),
+        },
+        "partial_latency": percentiles([l for s in sessions for l in s["latencies"]]),
+        "tick_latency": tick_latency(
+            [s["session_id"] for s in sessions], args.bucket_seconds
+        ),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    data, seconds = load(args.fixture, args.fixtures_dir)
+    with Server() as server:
+        token = await signup(server.port)
+        runs = []
+        for n in args.sessions:
+            runs.append(await run_level(args, server.port, token, data, seconds, n))
+
+    keeping_up = [
+        r["sessions"]
+        for r in runs
+        if r["real_time_factor"]["max"] <= 1 + args.rtf_slack
+    ]
+    capacity = max(keeping_up, default=0)
+    return {
+        "environment": environment(),
+        "config": {
+            "fixture": args.fixture,
+            "fixture_seconds": seconds,
+            "pace": args.pace,
+            "chunk_ms": args.chunk_ms,
+            "rtf_slack": args.rtf_slack,
+            "model": args.model or f"fake(cost={args.cost})",
+            "max_batch_size": settings.INFERENCE_MAX_BATCH_SIZE,
+            "tick_interval": settings.CHUNK_INTERVAL,
+        },
+        "runs": runs,
+        "capacity": {
+            "sessions": capacity,
+            "sessions_per_core": round(capacity / environment()["cpu_count"], 2),
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixture", default="speech-30s")
+    parser.add_argument("--fixtures-dir", default=FIXTURES_DIR)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--pace", type=float, default=1.0)
+    parser.add_argument("--chunk-ms", type=int, default=100)
+    parser.add_argument("--rtf-slack", type=float, default=0.05)
+    parser.add_argument("--bucket-seconds", type=float, default=10.0)
+    parser.add_argument("--model")
+    parser.add_argument("--cost", type=float, default=0.05)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    tracer.capacity = max(tracer.capacity, sum(args.sessions))
+    # Every session signs in as the same user.
+    session_admission.max_sessions_per_user = max(args.sessions)
+    if args.model is None:
+        settings.TRANSCRIPTION_ENGINE = "fake"
+        settings.FAKE_ENGINE_LATENCY_SECONDS = 0.0
+        settings.FAKE_ENGINE_SECONDS_PER_AUDIO_SECOND = args.cost
+    else:
+        settings.PRELOAD_MODEL_TIERS = [args.model]
+        settings.DEFAULT_MODEL_TIER = args.model
+
+    Base.metadata.create_all(bind=engine)
+    try:
+        write_results(asyncio.run(run(args)), args.output)
+    finally:
+        remove_database()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,35 @@
 import uuid
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    DDL,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    event,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from db.base import Base
 
+SNIPPET_LENGTH = 160
+
+
+def make_snippet(text: str) -> str:
+    text = " ".join(text.split())
+    if len(text) <= SNIPPET_LENGTH:
+        return text
+    cut = text[: SNIPPET_LENGTH - 1]
+    if " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return cut + "…"
+
 
 class Session(Base):
     __tablename__ = "sessions"
@@ -17,6 +40,7 @@ class Session(Base):
     end_time = Column(DateTime(timezone=True), nullable=False)
     duration_seconds = Column(Integer, nullable=False)
     final_transcript = Column(Text, nullable=False)
+    snippet = Column(String(200))
     word_count = Column(Integer, nullable=False)
     language = Column(String(10))
     model_used = Column(String(50))
@@ -26,6 +50,41 @@ class Session(Base):
     )
 
     user = relationship("User", back_populates="sessions")
+    segments = relationship(
+        "TranscriptSegment",
+        back_populates="session",
+        order_by="TranscriptSegment.position",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    __table_args__ = (
+        Index("ix_sessions_user_id_start_time", user_id, start_time.desc()),
+    )
+
+
+class TranscriptSegment(Base):
+    __tablename__ = "transcript_segments"
+
+    session_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("sessions.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    position = Column(Integer, primary_key=True)
+    start = Column(Float, nullable=False)
+    end = Column(Float, nullable=False)
+    text = Column(Text, nullable=False)
+    language = Column(String(10))
+    confidence = Column(Float)
+
+    session = relationship("Session", back_populates="segments")
+
+
+@event.listens_for(Session, "before_insert")
+@event.listens_for(Session, "before_update")
+def _set_snippet(mapper, connection, target: Session) -> None:
+    target.snippet = make_snippet(target.final_transcript or "")
 
 
 class User(Base):
@@ -37,3 +96,27 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     sessions = relationship("Session", back_populates="user")
+
+
+# SQLite stand-in for the Postgres tsvector column, so search can run in tests.
+for statement in [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS sessions_fts USING fts5("
+    "session_id UNINDEXED, user_id UNINDEXED, final_transcript)",
+    "CREATE TRIGGER IF NOT EXISTS sessions_fts_insert AFTER INSERT ON sessions "
+    "BEGIN INSERT INTO sessions_fts (session_id, user_id, final_transcript) "
+    "VALUES (new.id, new.user_id, new.final_transcript); END",
+    "CREATE TRIGGER IF NOT EXISTS sessions_fts_update "
+    "AFTER UPDATE OF final_transcript ON sessions "
+    "BEGIN UPDATE sessions_fts SET final_transcript = new.final_transcript "
+    "WHERE session_id = new.id; END",
+    "CREATE TRIGGER IF NOT EXISTS sessions_fts_delete AFTER DELETE ON sessions "
+    "BEGIN DELETE FROM sessions_fts WHERE session_id = old.id; END",
+]:
+    event.listen(
+        Session.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite")
+    )
+event.listen(
+    Session.__table__,
+    "after_drop",
+    DDL("DROP TABLE IF EXISTS sessions_fts").execute_if(dialect="sqlite"),
+)
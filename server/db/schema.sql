@@ -14,11 +14,29 @@ CREATE TABLE sessions (
     end_time TIMESTAMP WITH TIME ZONE NOT NULL,
     duration_seconds INTEGER NOT NULL,
     final_transcript TEXT NOT NULL,
+    snippet VARCHAR(200),
     word_count INTEGER NOT NULL,
     language VARCHAR(10),
     model_used VARCHAR(50),
     created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+    search_vector TSVECTOR GENERATED ALWAYS AS (to_tsvector('english', final_transcript)) STORED,
     PRIMARY KEY (id),
     FOREIGN KEY(user_id) REFERENCES users (id)
 );
+
+CREATE INDEX ix_sessions_user_id_start_time ON sessions (user_id, start_time DESC);
+
+CREATE INDEX ix_sessions_search_vector ON sessions USING gin (search_vector);
+
+CREATE TABLE transcript_segments (
+    session_id UUID NOT NULL,
+    position INTEGER NOT NULL,
+    start FLOAT NOT NULL,
+    "end" FLOAT NOT NULL,
+    text TEXT NOT NULL,
+    language VARCHAR(10),
+    confidence FLOAT,
+    PRIMARY KEY (session_id, position),
+    FOREIGN KEY(session_id) REFERENCES sessions (id) ON DELETE CASCADE
+);
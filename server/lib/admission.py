@@ -0,0 +1,131 @@
+import asyncio
+import time
+import uuid
+from typing import Awaitable, Callable, Optional
+
+from lib.config import settings
+from lib.metrics import Gauge, register
+from lib.scheduler import InferenceScheduler
+
+WORKER_FULL = "Server is at capacity"
+USER_FULL = "Too many concurrent sessions"
+INFERENCE_BUSY = "Inference queue is full"
+
+
+class AdmissionRefused(Exception):
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class SessionAdmission:
+    # Admits live sessions against a per-worker cap, a per-user cap and the
+    # depth of the inference queue, so past capacity new sessions are turned
+    # away instead of every session falling behind at once. When the worker
+    # is full, up to ``wait_queue_size`` sessions may wait in line for
+    # ``wait_timeout`` seconds; a user over their own quota never waits.
+
+    def __init__(
+        self,
+        max_sessions: int,
+        max_sessions_per_user: int,
+        max_inference_pending: int,
+        wait_queue_size: int,
+        wait_timeout: float,
+        poll_interval: float,
+        retry_after: float,
+    ):
+        self.max_sessions = max_sessions
+        self.max_sessions_per_user = max_sessions_per_user
+        self.max_inference_pending = max_inference_pending
+        self.wait_queue_size = wait_queue_size
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.retry_after = retry_after
+        self.active = 0
+        self._per_user: dict[uuid.UUID, int] = {}
+        self._waiting: list[object] = []
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiting)
+
+    def try_acquire(self, user_id: uuid.UUID, scheduler: InferenceScheduler) -> bool:
+        if self._waiting or self._refusal(user_id, scheduler) is not None:
+            return False
+        self._admit(user_id)
+        return True
+
+    async def acquire(
+        self,
+        user_id: uuid.UUID,
+        scheduler: InferenceScheduler,
+        on_queued: Callable[[int], Awaitable[None]],
+    ) -> None:
+        if self.try_acquire(user_id, scheduler):
+            return
+        refusal = self._refusal(user_id, scheduler)
+        if refusal == USER_FULL or len(self._waiting) >= self.wait_queue_size:
+            raise AdmissionRefused(refusal or WORKER_FULL, self.retry_after)
+
+        ticket = object()
+        self._waiting.append(ticket)
+        deadline = time.monotonic() + self.wait_timeout
+        position = None
+        try:
+            while True:
+                index = self._waiting.index(ticket)
+                refusal = self._refusal(user_id, scheduler)
+                if index == 0 and refusal is None:
+                    self._admit(user_id)
+                    return
+                if time.monotonic() >= deadline:
+                    raise AdmissionRefused(refusal or WORKER_FULL, self.retry_after)
+                if index + 1 != position:
+                    position = index + 1
+                    await on_queued(position)
+                await asyncio.sleep(self.poll_interval)
+        finally:
+            self._waiting.remove(ticket)
+
+    def release(self, user_id: uuid.UUID) -> None:
+        self.active -= 1
+        remaining = self._per_user[user_id] - 1
+        if remaining:
+            self._per_user[user_id] = remaining
+        else:
+            del self._per_user[user_id]
+
+    def _refusal(
+        self, user_id: uuid.UUID, scheduler: InferenceScheduler
+    ) -> Optional[str]:
+        if self._per_user.get(user_id, 0) >= self.max_sessions_per_user:
+            return USER_FULL
+        if self.active >= self.max_sessions:
+            return WORKER_FULL
+        if scheduler.pending >= self.max_inference_pending:
+            return INFERENCE_BUSY
+        return None
+
+    def _admit(self, user_id: uuid.UUID) -> None:
+        self.active += 1
+        self._per_user[user_id] = self._per_user.get(user_id, 0) + 1
+
+
+session_admission = SessionAdmission(
+    max_sessions=settings.MAX_SESSIONS_PER_WORKER,
+    max_sessions_per_user=settings.MAX_SESSIONS_PER_USER,
+    max_inference_pending=settings.ADMISSION_MAX_INFERENCE_PENDING,
+    wait_queue_size=settings.ADMISSION_WAIT_QUEUE_SIZE,
+    wait_timeout=settings.ADMISSION_WAIT_TIMEOUT_SECONDS,
+    poll_interval=settings.ADMISSION_POLL_SECONDS,
+    retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS,
+)
+register(
+    Gauge(
+        "transcribe_admission_waiting",
+        "Sessions waiting in line for admission.",
+        lambda: session_admission.waiting,
+    )
+)
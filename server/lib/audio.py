@@ -0,0 +1,250 @@
+import io
+import mmap
+import tempfile
+import threading
+from typing import IO, Optional
+
+import av
+import numpy as np
+
+from lib.config import settings
+from lib.metrics import Gauge, register
+
+SAMPLE_RATE = 16000
+
+
+class AudioMemoryBudget:
+    # Shares a process-wide cap on in-memory audio between sessions. A session
+    # always gets at least the minimum it needs to stream; beyond that it gets
+    # whatever is left, and spills to disk sooner.
+
+    def __init__(self, limit_bytes: int):
+        self.limit_bytes = limit_bytes
+        self.used_bytes = 0
+        self._lock = threading.Lock()
+
+    def reserve(self, wanted: int, minimum: int) -> int:
+        with self._lock:
+            granted = max(minimum, min(wanted, self.limit_bytes - self.used_bytes))
+            self.used_bytes += granted
+            return granted
+
+    def release(self, nbytes: int) -> None:
+        with self._lock:
+            self.used_bytes -= nbytes
+
+
+audio_memory = AudioMemoryBudget(settings.AUDIO_WORKER_MEMORY_MB * 1024 * 1024)
+register(
+    Gauge(
+        "transcribe_audio_buffer_bytes",
+        "In-memory audio reserved by live sessions and jobs.",
+        lambda: audio_memory.used_bytes,
+    )
+)
+
+
+class AudioStore:
+    # Keeps the most recent audio in memory and spills older audio to an
+    # unlinked temp file that is read back through mmap. Samples are never
+    # rewritten in place: when the hot window fills, its newer half moves to
+    # a fresh array. Arrays returned by read() are therefore read-only views,
+    # not copies, and stay valid while the decoder keeps appending.
+
+    def __init__(
+        self,
+        capacity_seconds: float,
+        sample_rate: int = SAMPLE_RATE,
+        spill_seconds: float = 0.0,
+        budget: Optional[AudioMemoryBudget] = None,
+        min_capacity_seconds: float = 0.0,
+    ):
+        self.sample_rate = sample_rate
+        itemsize = np.dtype(np.float32).itemsize
+        capacity = max(int(capacity_seconds * sample_rate), 1)
+        if budget is not None:
+            minimum = max(int(min_capacity_seconds * sample_rate), 1)
+            capacity = budget.reserve(capacity * itemsize, minimum * itemsize)
+            capacity //= itemsize
+        self._budget = budget
+        self._hot = np.empty(capacity, dtype=np.float32)
+        self._hot_start = 0
+        self._hot_len = 0
+        self._spill_limit = int(spill_seconds * sample_rate)
+        self._file: Optional[IO[bytes]] = None
+        self._cold_len = 0
+        self._cold: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+        self.total_samples = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self._hot)
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._hot.nbytes
+
+    @property
+    def spilled_bytes(self) -> int:
+        return self._cold_len * self._hot.itemsize
+
+    @property
+    def duration(self) -> float:
+        return self.total_samples / self.sample_rate
+
+    @property
+    def start_time(self) -> float:
+        return (self._hot_start - self._cold_len) / self.sample_rate
+
+    def append(self, samples: np.ndarray) -> None:
+        with self._lock:
+            while len(samples):
+                if self._hot_len == len(self._hot):
+                    self._evict()
+                count = min(len(samples), len(self._hot) - self._hot_len)
+                self._hot[self._hot_len : self._hot_len + count] = samples[:count]
+                self._hot_len += count
+                self.total_samples += count
+                samples = samples[count:]
+
+    def read(self, start: float, end: Optional[float] = None) -> np.ndarray:
+        with self._lock:
+            cold_start = self._hot_start - self._cold_len
+            first = max(int(start * self.sample_rate), cold_start)
+            last = self.total_samples
+            if end is not None:
+                last = min(last, int(end * self.sample_rate))
+            if last <= first:
+                return np.zeros(0, dtype=np.float32)
+
+            if first >= self._hot_start:
+                view = self._hot[first - self._hot_start : last - self._hot_start]
+                view.flags.writeable = False
+                return view
+
+            cold = self._cold_view()[
+                first - cold_start : min(last, self._hot_start) - cold_start
+            ]
+            if last <= self._hot_start:
+                return cold
+            return np.concatenate((cold, self._hot[: last - self._hot_start]))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._budget is not None:
+                self._budget.release(self._hot.nbytes)
+                self._budget = None
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _evict(self) -> None:
+        keep = len(self._hot) // 2
+        drop = self._hot_len - keep
+        self._spill(self._hot[:drop])
+        hot = np.empty_like(self._hot)
+        hot[:keep] = self._hot[drop : self._hot_len]
+        self._hot = hot
+        self._hot_start += drop
+        self._hot_len = keep
+
+    def _spill(self, samples: np.ndarray) -> None:
+        if self._cold_len + len(samples) > self._spill_limit:
+            # Over the disk cap: forget everything spilled so far. The old
+            # file is only closed, not truncated, so mapped views stay valid.
+            if self._file is not None:
+                self._file.close()
+            self._file, self._cold, self._cold_len = None, None, 0
+            if len(samples) > self._spill_limit:
+                return
+
+        if self._file is None:
+            self._file = tempfile.TemporaryFile()
+        self._file.write(samples.tobytes())
+        self._cold_len += len(samples)
+
+    def _cold_view(self) -> np.ndarray:
+        if self._cold is None or len(self._cold) != self._cold_len:
+            self._file.flush()
+            mapped = mmap.mmap(
+                self._file.fileno(), self.spilled_bytes, access=mmap.ACCESS_READ
+            )
+            self._cold = np.frombuffer(mapped, dtype=np.float32)
+        return self._cold
+
+
+class _ByteStream(io.RawIOBase):
+    def __init__(self):
+        self._pending = bytearray()
+        self._condition = threading.Condition()
+        self._eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def feed(self, data: bytes) -> None:
+        with self._condition:
+            self._pending.extend(data)
+            self._condition.notify()
+
+    def end(self) -> None:
+        with self._condition:
+            self._eof = True
+            self._condition.notify()
+
+    def readinto(self, target) -> int:
+        with self._condition:
+            while not self._pending and not self._eof:
+                self._condition.wait()
+            size = min(len(target), len(self._pending))
+            target[:size] = self._pending[:size]
+            del self._pending[:size]
+            return size
+
+
+class StreamingDecoder:
+    # Demuxes and decodes the MediaRecorder container exactly once: a
+    # background thread blocks on newly fed bytes and appends the resampled
+    # PCM to ``buffer`` as soon as each frame is available.
+
+    def __init__(self, buffer: AudioStore):
+        self.buffer = buffer
+        self.error: Optional[Exception] = None
+        self._stream = _ByteStream()
+        self._thread: Optional[threading.Thread] = None
+
+    def feed(self, data: bytes) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        self._stream.feed(data)
+
+    def close(self) -> None:
+        self._stream.end()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        try:
+            decode_into(self._stream, self.buffer)
+        except Exception as exc:
+            self.error = exc
+        finally:
+            # Keep draining so the receiving side never blocks on a dead reader.
+            while self._stream.read(65536):
+                pass
+
+
+def decode_into(source, buffer: AudioStore) -> None:
+    resampler = av.AudioResampler(format="s16", layout="mono", rate=buffer.sample_rate)
+    with av.open(source, mode="r", metadata_errors="ignore") as container:
+        for frame in container.decode(audio=0):
+            _append(buffer, resampler.resample(frame))
+    _append(buffer, resampler.resample(None))
+
+
+def _append(buffer: AudioStore, frames: list[av.AudioFrame]) -> None:
+    for frame in frames:
+        samples = frame.to_ndarray().reshape(-1).astype(np.float32) / 32768.0
+        buffer.append(samples)
@@ -1,29 +1,47 @@
+import uuid
 from datetime import UTC, datetime, timedelta
 from typing import Optional
 
 import bcrypt
 import jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.models import User
 from lib.config import settings
+from lib.metrics import auth_seconds, timed
+from lib.user_cache import user_cache
 
 
-def get_user_from_token(token: str, db: Session) -> Optional[User]:
+@timed(auth_seconds)
+async def get_user_from_token(token: str, db: AsyncSession) -> Optional[User]:
+    user = user_cache.get(token)
+    if user is not None:
+        return user
+
     payload = decode_access_token(token)
     if payload is None:
         return None
 
-    user_id = payload.get("sub")
-    if user_id is None:
+    user_id_str = payload.get("sub")
+    if user_id_str is None:
+        return None
+
+    try:
+        user_id = uuid.UUID(user_id_str)
+    except ValueError:
         return None
 
-    user = db.query(User).filter(User.id == user_id).first()
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalars().first()
+    if user is not None:
+        user_cache.set(token, user, payload.get("exp"))
     return user
 
 
-def get_password_hash(password):
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+def get_password_hash(password, rounds: Optional[int] = None):
+    salt = bcrypt.gensalt(rounds or settings.BCRYPT_ROUNDS)
+    return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
 
 
 def verify_password(plain_password, hashed_password):
@@ -0,0 +1,72 @@
+import time
+from typing import Optional, Protocol
+
+import numpy as np
+
+from lib.audio import SAMPLE_RATE
+from lib.inference import TranscriptionResult
+from lib.streaming import Segment
+
+
+class TranscriptionEngine(Protocol):
+    # What executors run: transcribe a batch of independent windows, each
+    # with its language or None to detect it. Streaming state (committing,
+    # overlap, finalisation) stays in StreamingTranscript, so any engine that
+    # can transcribe a window works for live sessions and batch jobs alike.
+
+    def transcribe_batch(
+        self, windows: list[np.ndarray], languages: list[Optional[str]]
+    ) -> list[TranscriptionResult]: ...
+
+
+class FakeEngine:
+    # Deterministic stand-in for a model: sleeps instead of computing, so
+    # thousands of synthetic sessions exercise the websocket, scheduling and
+    # DB layers without weights or CPU. Each window yields one segment per
+    # ``segment_seconds``, cycling through ``words``.
+
+    def __init__(
+        self,
+        latency: float,
+        seconds_per_audio_second: float,
+        segment_seconds: float,
+        words: list[str],
+        language: str,
+    ):
+        self.latency = latency
+        self.seconds_per_audio_second = seconds_per_audio_second
+        self.segment_seconds = segment_seconds
+        self.words = words
+        self.language = language
+
+    def transcribe_batch(
+        self, windows: list[np.ndarray], languages: list[Optional[str]]
+    ) -> list[TranscriptionResult]:
+        audio_seconds = sum(len(window) for window in windows) / SAMPLE_RATE
+        time.sleep(self.latency + self.seconds_per_audio_second * audio_seconds)
+        return [
+            self._transcribe(window, language)
+            for window, language in zip(windows, languages)
+        ]
+
+    def _transcribe(
+        self, window: np.ndarray, language: Optional[str]
+    ) -> TranscriptionResult:
+        count = int(len(window) / SAMPLE_RATE / self.segment_seconds)
+        segments = [
+            Segment(
+                start=i * self.segment_seconds,
+                end=(i + 1) * self.segment_seconds,
+                text=" " + self.words[i % len(self.words)],
+                confidence=1.0,
+            )
+            for i in range(count)
+        ]
+        if language is not None:
+            return {"segments": segments, "language": language}
+        return {
+            "segments": segments,
+            "language": self.language,
+            "language_probability": 1.0,
+            "detection_seconds": 0.0,
+        }
@@ -0,0 +1,83 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from lib.auth import get_password_hash, verify_password
+from lib.config import settings
+
+
+class HasherBusy(Exception):
+    pass
+
+
+class PasswordHasher:
+    # Runs bcrypt away from the event loop and the request threadpool. At most
+    # ``workers`` hashes run at once and ``max_queue`` more may wait; anything
+    # beyond that is rejected straight away instead of queueing behind a burst.
+
+    def __init__(
+        self, workers: int, max_queue: int, rounds: int, use_processes: bool = True
+    ):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.rounds = rounds
+        self.use_processes = use_processes
+        self.pending = 0
+        self.rejected = 0
+        self._executor: Optional[Executor] = None
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password, self.rounds)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._run(verify_password, password, hashed)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise HasherBusy()
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.pending -= 1
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.use_processes:
+                self._executor = ProcessPoolExecutor(
+                    self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(self.workers)
+        return self._executor
+
+
+_hasher: Optional[PasswordHasher] = None
+
+
+def get_password_hasher() -> PasswordHasher:
+    global _hasher
+    if _hasher is None:
+        _hasher = PasswordHasher(
+            workers=settings.PASSWORD_HASH_WORKERS,
+            max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+            rounds=settings.BCRYPT_ROUNDS,
+            use_processes=settings.PASSWORD_HASH_USE_PROCESSES,
+        )
+    return _hasher
+
+
+def stop_password_hasher() -> None:
+    global _hasher
+    if _hasher is not None:
+        _hasher.close()
+        _hasher = None
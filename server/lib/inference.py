@@ -0,0 +1,117 @@
+import asyncio
+import math
+import time
+from typing import Any, Callable, NotRequired, Optional, TypedDict
+
+import numpy as np
+from faster_whisper import BatchedInferencePipeline, WhisperModel
+
+from lib.audio import SAMPLE_RATE
+from lib.streaming import Segment
+
+
+class TranscriptionResult(TypedDict):
+    segments: list[Segment]
+    language: Optional[str]
+    # Only present when the language was detected for this window.
+    language_probability: NotRequired[float]
+    detection_seconds: NotRequired[float]
+
+
+class BatchTranscriber:
+    def __init__(self, model: WhisperModel):
+        self.model = model
+        self._pipeline = BatchedInferencePipeline(model)
+
+    def transcribe_batch(
+        self, windows: list[np.ndarray], languages: list[Optional[str]]
+    ) -> list[TranscriptionResult]:
+        groups: dict[str, list[int]] = {}
+        detected: dict[int, tuple[float, float]] = {}
+        for index, (window, language) in enumerate(zip(windows, languages)):
+            if language is None:
+                started = time.perf_counter()
+                language, probability, _ = self.model.detect_language(audio=window)
+                detected[index] = (probability, time.perf_counter() - started)
+            groups.setdefault(language, []).append(index)
+
+        results: list[TranscriptionResult] = [
+            {"segments": [], "language": None} for _ in windows
+        ]
+        for language, indices in groups.items():
+            group = [windows[i] for i in indices]
+            for index, segments in zip(
+                indices, self._transcribe_group(group, language)
+            ):
+                results[index] = {"segments": segments, "language": language}
+        for index, (probability, seconds) in detected.items():
+            results[index]["language_probability"] = probability
+            results[index]["detection_seconds"] = seconds
+        return results
+
+    def _transcribe_group(
+        self, windows: list[np.ndarray], language: str
+    ) -> list[list[Segment]]:
+        if len(windows) == 1:
+            segments, _ = self.model.transcribe(windows[0], language=language)
+            return [[_segment(s) for s in segments]]
+
+        offsets = np.cumsum([0] + [len(window) for window in windows]) / SAMPLE_RATE
+        clips = [
+            {"start": offsets[i], "end": offsets[i + 1]} for i in range(len(windows))
+        ]
+        segments, _ = self._pipeline.transcribe(
+            np.concatenate(windows),
+            language=language,
+            clip_timestamps=clips,
+            vad_filter=False,
+            without_timestamps=False,
+            batch_size=len(windows),
+        )
+
+        grouped: list[list[Segment]] = [[] for _ in windows]
+        for segment in segments:
+            index = int(np.searchsorted(offsets, segment.start, side="right")) - 1
+            index = min(max(index, 0), len(windows) - 1)
+            start = float(offsets[index])
+            grouped[index].append(
+                _segment(
+                    segment,
+                    start=segment.start - start,
+                    end=min(segment.end, float(offsets[index + 1])) - start,
+                )
+            )
+        return grouped
+
+
+def _segment(segment, start=None, end=None) -> Segment:
+    return Segment(
+        start=segment.start if start is None else start,
+        end=segment.end if end is None else end,
+        text=segment.text,
+        confidence=math.exp(segment.avg_logprob),
+    )
+
+
+class ThreadExecutor:
+    concurrency = 1
+
+    def __init__(self, loader: Callable[[], Any]):
+        self.loader = loader
+
+    async def transcribe_batch(
+        self, windows: list[np.ndarray], languages: list[Optional[str]]
+    ) -> list[TranscriptionResult]:
+        return await asyncio.to_thread(self._transcribe_batch, windows, languages)
+
+    async def warmup(self, audio: np.ndarray) -> None:
+        await self.transcribe_batch([audio], [None])
+
+    async def close(self) -> None:
+        pass
+
+    def _transcribe_batch(
+        self, windows: list[np.ndarray], languages: list[Optional[str]]
+    ) -> list[TranscriptionResult]:
+        # Resolved per batch so an evicted engine is not pinned by the executor.
+        return self.loader().transcribe_batch(windows, languages)
@@ -0,0 +1,240 @@
+import asyncio
+import os
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from typing import Optional
+
+from db.base import AsyncSessionLocal
+from db.models import Session as SessionModel
+from db.models import TranscriptSegment
+from lib.audio import AudioStore, audio_memory, decode_into
+from lib.config import settings
+from lib.scheduler import InferenceScheduler
+from lib.streaming import Segment
+from lib.vad import split_at_silence
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+@dataclass
+class Job:
+    user_id: uuid.UUID
+    path: str
+    scheduler: InferenceScheduler
+    language: Optional[str] = None
+    id: uuid.UUID = field(default_factory=uuid.uuid4)
+    status: str = "queued"
+    chunks_total: int = 0
+    chunks_done: int = 0
+    duration_seconds: Optional[float] = None
+    session_id: Optional[uuid.UUID] = None
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+    finished_at: Optional[float] = None
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    @property
+    def progress(self) -> float:
+        if self.status == "completed":
+            return 1.0
+        if not self.chunks_total:
+            return 0.0
+        return self.chunks_done / self.chunks_total
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled")
+
+
+class JobManager:
+    # In-process job queue: up to ``max_concurrent`` jobs run at once, each
+    # fanning its chunks out to the shared inference scheduler, where they
+    # batch with each other and with live sessions. Jobs do not survive a
+    # restart.
+
+    def __init__(self, max_concurrent: int, max_pending: int, session_factory):
+        self.max_concurrent = max_concurrent
+        self.max_pending = max_pending
+        self.session_factory = session_factory
+        self.jobs: dict[uuid.UUID, Job] = {}
+        self._queue: deque[Job] = deque()
+        self._running = 0
+
+    def submit(self, job: Job) -> Job:
+        self._prune()
+        if sum(not j.finished for j in self.jobs.values()) >= self.max_pending:
+            raise JobQueueFull()
+        self.jobs[job.id] = job
+        self._queue.append(job)
+        self._start_next()
+        return job
+
+    def get(self, job_id: uuid.UUID, user_id: uuid.UUID) -> Optional[Job]:
+        job = self.jobs.get(job_id)
+        if job is None or job.user_id != user_id:
+            return None
+        return job
+
+    def cancel(self, job: Job) -> None:
+        if job.finished:
+            return
+        if job in self._queue:
+            self._queue.remove(job)
+            self._finish(job, "cancelled")
+            _remove(job.path)
+        elif job.task is not None:
+            job.task.cancel()
+
+    async def shutdown(self) -> None:
+        for job in list(self._queue):
+            self.cancel(job)
+        tasks = [
+            job.task for job in self.jobs.values() if job.task and not job.finished
+        ]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _start_next(self) -> None:
+        while self._running < self.max_concurrent and self._queue:
+            job = self._queue.popleft()
+            self._running += 1
+            job.status = "running"
+            job.task = asyncio.create_task(self._run(job))
+
+    async def _run(self, job: Job) -> None:
+        try:
+            await self._process(job)
+            self._finish(job, "completed")
+        except asyncio.CancelledError:
+            self._finish(job, "cancelled")
+        except Exception as exc:
+            job.error = str(exc) or type(exc).__name__
+            self._finish(job, "failed")
+        finally:
+            _remove(job.path)
+            self._running -= 1
+            self._start_next()
+
+    async def _process(self, job: Job) -> None:
+        audio = AudioStore(
+            settings.AUDIO_BUFFER_SECONDS,
+            spill_seconds=settings.JOB_MAX_AUDIO_SECONDS,
+            budget=audio_memory,
+            min_capacity_seconds=2 * settings.JOB_CHUNK_MAX_SECONDS,
+        )
+        try:
+            await asyncio.to_thread(decode_into, job.path, audio)
+            if audio.start_time > 0:
+                raise ValueError("Audio is too long")
+            if not audio.total_samples:
+                raise ValueError("No audio found")
+            job.duration_seconds = audio.duration
+
+            chunks = await asyncio.to_thread(
+                split_at_silence,
+                audio,
+                settings.JOB_CHUNK_MIN_SECONDS,
+                settings.JOB_CHUNK_MAX_SECONDS,
+                settings.VAD_FRAME_MS,
+                settings.VAD_MIN_SILENCE_MS,
+            )
+            job.chunks_total = len(chunks)
+            slots = asyncio.Semaphore(settings.JOB_PARALLEL_CHUNKS)
+
+            async def transcribe(start: float, end: float, language: Optional[str]):
+                async with slots:
+                    result = await job.scheduler.transcribe(
+                        audio.read(start, end), language
+                    )
+                job.chunks_done += 1
+                return [
+                    Segment(
+                        start=start + s.start,
+                        end=start + s.end,
+                        text=s.text,
+                        confidence=s.confidence,
+                    )
+                    for s in result["segments"]
+                ], result["language"]
+
+            # The first chunk settles the language for the rest of the job.
+            first, language = await transcribe(*chunks[0], job.language)
+            rest = await asyncio.gather(
+                *(transcribe(start, end, language) for start, end in chunks[1:])
+            )
+            segments = first + [s for chunk, _ in rest for s in chunk]
+            await self._save(job, segments, language)
+        finally:
+            audio.close()
+
+    async def _save(
+        self, job: Job, segments: list[Segment], language: Optional[str]
+    ) -> None:
+        spoken = [s for s in segments if s.text.strip()]
+        transcript = " ".join(s.text.strip() for s in spoken)
+        session = SessionModel(
+            user_id=job.user_id,
+            start_time=job.created_at,
+            end_time=job.created_at + timedelta(seconds=job.duration_seconds),
+            duration_seconds=int(job.duration_seconds),
+            final_transcript=transcript,
+            word_count=len(transcript.split()),
+            language=language,
+            model_used=job.scheduler.model_name,
+        )
+        async with self.session_factory() as db:
+            db.add(session)
+            await db.flush()
+            db.add_all(
+                [
+                    TranscriptSegment(
+                        session_id=session.id,
+                        position=position,
+                        start=segment.start,
+                        end=segment.end,
+                        text=segment.text.strip(),
+                        language=language,
+                        confidence=segment.confidence,
+                    )
+                    for position, segment in enumerate(spoken)
+                ]
+            )
+            await db.commit()
+        job.session_id = session.id
+
+    def _finish(self, job: Job, status: str) -> None:
+        job.status = status
+        job.finished_at = time.monotonic()
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - settings.JOB_RETENTION_SECONDS
+        for job_id in [
+            job.id
+            for job in self.jobs.values()
+            if job.finished and job.finished_at < cutoff
+        ]:
+            del self.jobs[job_id]
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+job_manager = JobManager(
+    max_concurrent=settings.JOB_MAX_CONCURRENT,
+    max_pending=settings.JOB_MAX_PENDING,
+    session_factory=AsyncSessionLocal,
+)
+
+
+def get_job_manager() -> JobManager:
+    return job_manager
@@ -0,0 +1,133 @@
+import functools
+import time
+from bisect import bisect_left
+from typing import Callable, Optional
+
+# Metrics are recorded from the event loop thread without locks: an observe()
+# is a bisect and two additions. A rare lost increment from a thread-pool
+# caller is an acceptable price for keeping them off the hot path's profile.
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+INFERENCE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 0.75, 1, 1.5, 2, 3, 5, 10)
+RTF_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 5)
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, buckets: tuple[float, ...]):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            le = "+Inf" if bound == float("inf") else repr(float(bound))
+            lines.append(f'{self.name}_bucket{{le="{le}"}} {total}')
+        lines.append(f"{self.name}_sum {self.sum!r}")
+        lines.append(f"{self.name}_count {total}")
+        return lines
+
+
+class Gauge:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        function: Optional[Callable[[], float]] = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.function = function
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def render(self) -> list[str]:
+        value = self.function() if self.function is not None else self.value
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {float(value)!r}",
+        ]
+
+
+REGISTRY: list[Histogram | Gauge] = []
+
+
+def register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+
+def render() -> str:
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+def timed(histogram: Histogram):
+    def decorator(function):
+        @functools.wraps(function)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await function(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started)
+
+        return wrapper
+
+    return decorator
+
+
+tick_inference_seconds = register(
+    Histogram(
+        "transcribe_tick_inference_seconds",
+        "Time from submitting a session's window to getting its segments.",
+        INFERENCE_BUCKETS,
+    )
+)
+real_time_factor = register(
+    Histogram(
+        "transcribe_real_time_factor",
+        "Tick inference time divided by the duration of the window.",
+        RTF_BUCKETS,
+    )
+)
+websocket_send_seconds = register(
+    Histogram(
+        "transcribe_websocket_send_seconds",
+        "Time to hand one server message to the websocket.",
+        LATENCY_BUCKETS,
+    )
+)
+db_commit_seconds = register(
+    Histogram(
+        "transcribe_db_commit_seconds",
+        "Time to commit a finished session and its remaining segments.",
+        LATENCY_BUCKETS,
+    )
+)
+auth_seconds = register(
+    Histogram(
+        "auth_token_seconds",
+        "Time to resolve a bearer token to its user.",
+        LATENCY_BUCKETS,
+    )
+)
+active_sessions = register(
+    Gauge("transcribe_active_sessions", "Websocket sessions currently connected.")
+)
@@ -1,10 +1,179 @@
-from functools import lru_cache
 import os
+import threading
+import time
+from functools import partial
+from typing import Any, Callable, Optional
 
 from faster_whisper import WhisperModel
 
+from lib.config import ModelTierConfig, settings
+from lib.engines import FakeEngine, TranscriptionEngine
+from lib.inference import BatchTranscriber
+from lib.workers import InferenceWorkerPool
 
-@lru_cache()
-def get_model():
+
+def load_whisper_model(config: ModelTierConfig) -> WhisperModel:
     download_root = "/tmp" if os.environ.get("VERCEL") else None
-    return WhisperModel("tiny", device="cpu", compute_type="int8", download_root=download_root)
+    return WhisperModel(
+        config.size,
+        device="cpu",
+        compute_type=config.compute_type,
+        cpu_threads=config.cpu_threads,
+        num_workers=config.num_workers,
+        download_root=download_root,
+    )
+
+
+def load_engine(config: ModelTierConfig) -> TranscriptionEngine:
+    if settings.TRANSCRIPTION_ENGINE == "fake":
+        return FakeEngine(
+            latency=settings.FAKE_ENGINE_LATENCY_SECONDS,
+            seconds_per_audio_second=settings.FAKE_ENGINE_SECONDS_PER_AUDIO_SECOND,
+            segment_seconds=settings.FAKE_ENGINE_SEGMENT_SECONDS,
+            words=settings.FAKE_ENGINE_WORDS,
+            language=settings.FAKE_ENGINE_LANGUAGE,
+        )
+    return BatchTranscriber(load_whisper_model(config))
+
+
+def load_worker_pool(config: ModelTierConfig) -> InferenceWorkerPool:
+    pool = InferenceWorkerPool(
+        size=settings.INFERENCE_WORKERS,
+        loader=partial(load_engine, config),
+        capacity_seconds=(
+            settings.INFERENCE_MAX_BATCH_SIZE * settings.AUDIO_BUFFER_SECONDS
+        ),
+        timeout=settings.INFERENCE_WORKER_TIMEOUT_SECONDS,
+        health_interval=settings.INFERENCE_WORKER_HEALTH_INTERVAL_SECONDS,
+    )
+    pool.start()
+    return pool
+
+
+class ModelRegistry:
+    # Loads model tiers on first use and keeps them warm. When loading a tier
+    # would exceed the memory budget, the least recently used tiers are
+    # dropped first; a session that still holds one keeps it alive until it
+    # finishes. A tier loaded into ``copies`` worker processes costs that many
+    # times its memory, and one leased with ``acquire`` is never evicted, so
+    # ``unload`` can shut it down as soon as it is dropped.
+
+    def __init__(
+        self,
+        tiers: dict[str, ModelTierConfig],
+        memory_budget_mb: int,
+        loader: Callable[[ModelTierConfig], Any] = load_engine,
+        copies: int = 1,
+        unload: Optional[Callable[[Any], None]] = None,
+    ):
+        self.tiers = tiers
+        self.memory_budget_mb = memory_budget_mb
+        self.loader = loader
+        self.copies = copies
+        self.unload = unload
+        self._models: dict[str, Any] = {}
+        self._last_used: dict[str, float] = {}
+        self._leases: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._load_locks = {tier: threading.Lock() for tier in tiers}
+
+    def __contains__(self, tier: str) -> bool:
+        return tier in self.tiers
+
+    @property
+    def loaded(self) -> list[str]:
+        with self._lock:
+            return list(self._models)
+
+    @property
+    def memory_used_mb(self) -> int:
+        with self._lock:
+            return sum(self._cost(tier) for tier in self._models)
+
+    def model_name(self, tier: str) -> str:
+        if settings.TRANSCRIPTION_ENGINE == "fake":
+            return "fake"
+        return f"faster-whisper-{self.tiers[tier].size}"
+
+    def get(self, tier: str) -> Any:
+        return self._get(tier, lease=False)
+
+    def acquire(self, tier: str) -> Any:
+        return self._get(tier, lease=True)
+
+    def release(self, tier: str) -> None:
+        with self._lock:
+            self._leases[tier] -= 1
+            if not self._leases[tier]:
+                del self._leases[tier]
+
+    def evict(self, tier: str) -> None:
+        with self._lock:
+            model = self._models.pop(tier, None)
+            self._last_used.pop(tier, None)
+        if model is not None:
+            self._unload([model])
+
+    def _get(self, tier: str, lease: bool) -> Any:
+        config = self.tiers[tier]
+        with self._lock:
+            if tier in self._models:
+                self._last_used[tier] = time.monotonic()
+                return self._hold(tier, lease)
+
+        with self._load_locks[tier]:
+            with self._lock:
+                if tier in self._models:
+                    return self._hold(tier, lease)
+                evicted = self._make_room(self._cost(tier), keep=tier)
+            self._unload(evicted)
+
+            model = self.loader(config)
+            with self._lock:
+                self._models[tier] = model
+                self._last_used[tier] = time.monotonic()
+                return self._hold(tier, lease)
+
+    def _hold(self, tier: str, lease: bool) -> Any:
+        if lease:
+            self._leases[tier] = self._leases.get(tier, 0) + 1
+        return self._models[tier]
+
+    def _cost(self, tier: str) -> int:
+        return self.tiers[tier].memory_mb * self.copies
+
+    def _make_room(self, needed_mb: int, keep: str) -> list[Any]:
+        evicted = []
+        used = sum(self._cost(tier) for tier in self._models)
+        for tier in sorted(self._models, key=self._last_used.__getitem__):
+            if used + needed_mb <= self.memory_budget_mb:
+                break
+            if tier == keep or tier in self._leases:
+                continue
+            evicted.append(self._models.pop(tier))
+            del self._last_used[tier]
+            used -= self._cost(tier)
+        return evicted
+
+    def _unload(self, models: list[Any]) -> None:
+        if self.unload is not None:
+            for model in models:
+                self.unload(model)
+
+
+if settings.INFERENCE_WORKERS > 0:
+    # Each tier runs in its own pool of worker processes; the pools are what
+    # the budget is spent on, so they are what this registry tracks.
+    registry = ModelRegistry(
+        settings.MODEL_TIERS,
+        settings.MODEL_MEMORY_BUDGET_MB,
+        loader=load_worker_pool,
+        copies=settings.INFERENCE_WORKERS,
+        unload=InferenceWorkerPool.shutdown,
+    )
+else:
+    registry = ModelRegistry(settings.MODEL_TIERS, settings.MODEL_MEMORY_BUDGET_MB)
+
+
+def get_engine(tier: Optional[str] = None) -> TranscriptionEngine:
+    return registry.get(tier or settings.DEFAULT_MODEL_TIER)
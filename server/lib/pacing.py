@@ -0,0 +1,57 @@
+import os
+import random
+
+
+def cpu_pressure() -> float:
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except OSError:
+        return 0.0
+
+
+class TickPacer:
+    # Picks the delay before a session's next inference tick from its own
+    # measured latency: ticks are spaced ``headroom`` times the recent
+    # inference latency apart so they never run back to back, stretched
+    # further when the box as a whole is saturated and tightened towards
+    # ``min_interval`` when there is spare capacity.
+
+    def __init__(
+        self,
+        interval: float,
+        min_interval: float,
+        max_interval: float,
+        headroom: float,
+        smoothing: float = 0.3,
+    ):
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.headroom = headroom
+        self.smoothing = smoothing
+        self.latency = 0.0
+        self.real_time_factor = 0.0
+
+    def record(self, latency: float, audio_seconds: float) -> None:
+        self.latency = self._smooth(self.latency, latency)
+        if audio_seconds > 0:
+            self.real_time_factor = self._smooth(
+                self.real_time_factor, latency / audio_seconds
+            )
+
+    def next_interval(self, pressure: float) -> float:
+        target = max(self.min_interval, self.latency * self.headroom)
+        if pressure > 1:
+            target *= pressure
+        elif pressure < 0.5 and self.real_time_factor < 1 / self.headroom:
+            target = max(self.min_interval, target * (0.5 + pressure))
+
+        target = min(max(target, self.min_interval), self.max_interval)
+        self.interval = self._smooth(self.interval, target)
+        # Jitter keeps sessions that started together from ticking in lockstep.
+        return self.interval * random.uniform(0.9, 1.1)
+
+    def _smooth(self, current: float, sample: float) -> float:
+        if not current:
+            return sample
+        return (1 - self.smoothing) * current + self.smoothing * sample
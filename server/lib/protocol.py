@@ -0,0 +1,95 @@
+import time
+from typing import Optional
+
+import msgpack
+from fastapi import WebSocket
+
+from lib.metrics import websocket_send_seconds
+from lib.streaming import Segment, StreamingTranscript
+
+MSGPACK_V1 = "transcribe.v1.msgpack"
+
+
+class JsonProtocol:
+    # The default protocol: each update is a "partial" carrying whatever text
+    # appeared past the end of the previous one.
+    subprotocol: Optional[str] = None
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.sent_len = 0
+
+    async def send(self, message: dict) -> None:
+        started = time.perf_counter()
+        await self.websocket.send_json(message)
+        websocket_send_seconds.observe(time.perf_counter() - started)
+
+    def resumed(self, session_id: str, transcript: StreamingTranscript) -> dict:
+        text = transcript.text
+        self.sent_len = len(text)
+        return {"type": "resumed", "session_id": session_id, "text": text}
+
+    def update(self, transcript: StreamingTranscript) -> Optional[dict]:
+        text = transcript.text
+        new_text = text[self.sent_len :]
+        if not new_text:
+            return None
+        self.sent_len = len(text)
+        return {"type": "partial", "partial": new_text}
+
+
+class MsgpackProtocol:
+    # MessagePack frames with a per-connection ``seq``. Each "delta" appends
+    # newly committed segments and replaces the tentative tail, so a client
+    # holds exactly the server's transcript; a gap in ``seq`` means it should
+    # reconnect with its resume token to resync.
+    subprotocol = MSGPACK_V1
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.seq = 0
+        self.committed = 0
+        self.tentative: list[Segment] = []
+
+    async def send(self, message: dict) -> None:
+        self.seq += 1
+        message["seq"] = self.seq
+        started = time.perf_counter()
+        await self.websocket.send_bytes(msgpack.packb(message, use_single_float=True))
+        websocket_send_seconds.observe(time.perf_counter() - started)
+
+    def resumed(self, session_id: str, transcript: StreamingTranscript) -> dict:
+        self.committed = len(transcript.committed)
+        self.tentative = list(transcript.tentative)
+        return {
+            "type": "resumed",
+            "session_id": session_id,
+            "committed": _pack(transcript.committed),
+            "tentative": _pack(self.tentative),
+        }
+
+    def update(self, transcript: StreamingTranscript) -> Optional[dict]:
+        committed = transcript.committed[self.committed :]
+        if not committed and transcript.tentative == self.tentative:
+            return None
+        self.committed = len(transcript.committed)
+        self.tentative = list(transcript.tentative)
+        return {
+            "type": "delta",
+            "committed": _pack(committed),
+            "tentative": _pack(self.tentative),
+        }
+
+
+PROTOCOLS = {MSGPACK_V1: MsgpackProtocol}
+
+
+def negotiate(websocket: WebSocket) -> JsonProtocol | MsgpackProtocol:
+    for name in websocket.scope.get("subprotocols", []):
+        if name in PROTOCOLS:
+            return PROTOCOLS[name](websocket)
+    return JsonProtocol(websocket)
+
+
+def _pack(segments: list[Segment]) -> list[list]:
+    return [[s.start, s.end, s.text.strip()] for s in segments]
@@ -0,0 +1,66 @@
+import asyncio
+import uuid
+from typing import TYPE_CHECKING, Optional
+
+from lib.config import settings
+from lib.metrics import Gauge, register
+
+if TYPE_CHECKING:
+    from lib.transcription import TranscriptionService
+
+
+class ParkedSessions:
+    # Live sessions whose socket dropped without a stop message. Each keeps its
+    # audio, decoder and transcript for ``grace_seconds`` so a reconnect with
+    # its resume token picks up where it left off; after that it is finalised
+    # and saved as if the client had stopped.
+
+    def __init__(self, grace_seconds: float):
+        self.grace_seconds = grace_seconds
+        self._parked: dict[str, tuple["TranscriptionService", asyncio.Task]] = {}
+
+    def __len__(self) -> int:
+        return len(self._parked)
+
+    def park(
+        self, service: "TranscriptionService", deadline: Optional[float] = None
+    ) -> bool:
+        if self.grace_seconds <= 0 or service.session is None:
+            return False
+        # A session parked again after a refused resume keeps its deadline.
+        if deadline is None:
+            deadline = asyncio.get_running_loop().time() + self.grace_seconds
+        service.parked_until = deadline
+        expiry = asyncio.create_task(self._expire(service, deadline))
+        self._parked[service.resume_token] = (service, expiry)
+        return True
+
+    def take(self, token: str, user_id: uuid.UUID) -> Optional["TranscriptionService"]:
+        entry = self._parked.get(token)
+        if entry is None or entry[0].user.id != user_id:
+            return None
+        del self._parked[token]
+        entry[1].cancel()
+        return entry[0]
+
+    async def shutdown(self) -> None:
+        parked, self._parked = list(self._parked.values()), {}
+        for service, expiry in parked:
+            expiry.cancel()
+        for service, _ in parked:
+            await service.finish_detached()
+
+    async def _expire(self, service: "TranscriptionService", deadline: float) -> None:
+        await asyncio.sleep(deadline - asyncio.get_running_loop().time())
+        self._parked.pop(service.resume_token, None)
+        await service.finish_detached()
+
+
+parked_sessions = ParkedSessions(settings.RESUME_GRACE_SECONDS)
+register(
+    Gauge(
+        "transcribe_parked_sessions",
+        "Disconnected sessions waiting to be resumed.",
+        lambda: len(parked_sessions),
+    )
+)
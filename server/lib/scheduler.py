@@ -0,0 +1,206 @@
+import asyncio
+from dataclasses import dataclass
+from functools import partial
+from typing import Optional, Protocol
+
+import numpy as np
+from fastapi import Query, WebSocketException, status
+
+from lib.config import settings
+from lib.inference import ThreadExecutor, TranscriptionResult
+from lib.model import get_engine, registry
+
+
+class InferenceExecutor(Protocol):
+    concurrency: int
+
+    async def transcribe_batch(
+        self, windows: list[np.ndarray], languages: list[Optional[str]]
+    ) -> list[TranscriptionResult]: ...
+
+    async def warmup(self, audio: np.ndarray) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+@dataclass
+class _Request:
+    audio: np.ndarray
+    language: Optional[str]
+    future: asyncio.Future
+
+
+class InferenceScheduler:
+    # Collects inference windows from every live session and runs them as
+    # one batch, so concurrent sessions share encoder/decoder passes instead
+    # of competing for the same cores. While every executor slot is busy,
+    # new windows keep queueing and go out together in the next batch.
+
+    def __init__(
+        self,
+        executor: InferenceExecutor,
+        max_batch_size: int,
+        max_wait: float,
+        model_name: str = "",
+    ):
+        self.executor = executor
+        self.model_name = model_name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue: Optional[asyncio.Queue[_Request]] = None
+        self._task: Optional[asyncio.Task] = None
+        self.pending = 0
+
+    @property
+    def pressure(self) -> float:
+        return self.pending / (self.max_batch_size * self.executor.concurrency)
+
+    async def transcribe(
+        self, audio: np.ndarray, language: Optional[str] = None
+    ) -> TranscriptionResult:
+        if not len(audio):
+            return {"segments": [], "language": language}
+
+        queue = self._ensure_running()
+        future = asyncio.get_running_loop().create_future()
+        self.pending += 1
+        try:
+            await queue.put(_Request(audio=audio, language=language, future=future))
+            return await future
+        finally:
+            self.pending -= 1
+
+    async def warmup(self, audio: np.ndarray) -> None:
+        await self.executor.warmup(audio)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._queue = None
+        await self.executor.close()
+
+    def _ensure_running(self) -> asyncio.Queue[_Request]:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run(self._queue))
+        assert self._queue is not None
+        return self._queue
+
+    async def _run(self, queue: asyncio.Queue[_Request]) -> None:
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self.executor.concurrency)
+        dispatched: set[asyncio.Task] = set()
+        try:
+            while True:
+                await slots.acquire()
+                batch = [await queue.get()]
+                deadline = loop.time() + self.max_wait
+                while len(batch) < self.max_batch_size:
+                    if not queue.empty():
+                        batch.append(queue.get_nowait())
+                        continue
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+
+                task = loop.create_task(self._dispatch(batch, slots))
+                dispatched.add(task)
+                task.add_done_callback(dispatched.discard)
+        finally:
+            for task in dispatched:
+                task.cancel()
+
+    async def _dispatch(self, batch: list[_Request], slots: asyncio.Semaphore) -> None:
+        try:
+            batch = [request for request in batch if not request.future.done()]
+            if not batch:
+                return
+
+            try:
+                results = await self.executor.transcribe_batch(
+                    [request.audio for request in batch],
+                    [request.language for request in batch],
+                )
+            except Exception as exc:
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(exc)
+                return
+
+            for request, result in zip(batch, results):
+                if not request.future.done():
+                    request.future.set_result(result)
+        finally:
+            slots.release()
+
+
+class PooledExecutor:
+    # Leases the tier's worker pool from the registry for every call, so the
+    # registry only ever evicts (and shuts down) a pool nothing is using.
+
+    def __init__(self, tier: str):
+        self.tier = tier
+        self.concurrency = settings.INFERENCE_WORKERS
+
+    async def transcribe_batch(
+        self, windows: list[np.ndarray], languages: list[Optional[str]]
+    ) -> list[TranscriptionResult]:
+        pool = await asyncio.to_thread(registry.acquire, self.tier)
+        try:
+            return await pool.transcribe_batch(windows, languages)
+        finally:
+            registry.release(self.tier)
+
+    async def warmup(self, audio: np.ndarray) -> None:
+        pool = await asyncio.to_thread(registry.acquire, self.tier)
+        try:
+            await pool.warmup(audio)
+        finally:
+            registry.release(self.tier)
+
+    async def close(self) -> None:
+        await asyncio.to_thread(registry.evict, self.tier)
+
+
+def create_executor(tier: str) -> InferenceExecutor:
+    if settings.INFERENCE_WORKERS > 0:
+        return PooledExecutor(tier)
+    return ThreadExecutor(partial(get_engine, tier))
+
+
+_schedulers: dict[str, InferenceScheduler] = {}
+
+
+def get_scheduler(tier: str) -> InferenceScheduler:
+    if tier not in _schedulers:
+        _schedulers[tier] = InferenceScheduler(
+            create_executor(tier),
+            max_batch_size=settings.INFERENCE_MAX_BATCH_SIZE,
+            max_wait=settings.INFERENCE_MAX_WAIT_SECONDS,
+            model_name=registry.model_name(tier),
+        )
+    return _schedulers[tier]
+
+
+async def stop_schedulers() -> None:
+    for scheduler in _schedulers.values():
+        await scheduler.stop()
+
+
+def get_session_scheduler(model: Optional[str] = Query(None)) -> InferenceScheduler:
+    tier = model or settings.DEFAULT_MODEL_TIER
+    if tier not in registry:
+        raise WebSocketException(
+            code=status.WS_1008_POLICY_VIOLATION, reason="Unknown model tier"
+        )
+    return get_scheduler(tier)
@@ -0,0 +1,82 @@
+import re
+import uuid
+from typing import Optional
+
+from sqlalchemy import DateTime, bindparam, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+
+RESULT_COLUMNS = "id, start_time, duration_seconds, word_count, language, snippet"
+
+# Postgres keeps sessions.search_vector up to date as a generated column with
+# a GIN index (see the migration); the ORM never touches it.
+POSTGRES_QUERY = f"""
+SELECT {RESULT_COLUMNS}, rank,
+    ts_headline(
+        'english', final_transcript, query,
+        'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxFragments=2'
+    ) AS highlight
+FROM (
+    SELECT s.*, ts_rank_cd(s.search_vector, query)::float8 AS rank, query
+    FROM sessions s, websearch_to_tsquery('english', :query) AS query
+    WHERE s.user_id = :user_id AND s.search_vector @@ query
+) ranked
+{{after}}
+ORDER BY rank DESC, id DESC
+LIMIT :limit
+"""
+
+# SQLite mirrors transcripts into the sessions_fts FTS5 table via triggers
+# created alongside the sessions table (see db/models.py).
+SQLITE_QUERY = f"""
+SELECT * FROM (
+    SELECT {RESULT_COLUMNS}, -bm25(sessions_fts) AS rank,
+        snippet(
+            sessions_fts, 2, '{HIGHLIGHT_START}', '{HIGHLIGHT_STOP}', '…', 16
+        ) AS highlight
+    FROM sessions_fts JOIN sessions ON sessions.id = sessions_fts.session_id
+    WHERE sessions_fts MATCH :query AND sessions_fts.user_id = :user_id
+) ranked
+{{after}}
+ORDER BY rank DESC, id DESC
+LIMIT :limit
+"""
+
+AFTER_CLAUSE = "WHERE rank < :rank OR (rank = :rank AND id < :id)"
+
+
+def fts5_query(query: str) -> str:
+    # Quote every word so user input can never be parsed as FTS5 syntax.
+    return " ".join(f'"{word}"' for word in re.findall(r"\w+", query))
+
+
+async def search_sessions(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    query: str,
+    limit: int,
+    after: Optional[tuple[float, uuid.UUID]] = None,
+) -> list:
+    if db.bind.dialect.name == "sqlite":
+        sql, query = SQLITE_QUERY, fts5_query(query)
+        if not query:
+            return []
+    else:
+        sql = POSTGRES_QUERY
+
+    params = {"query": query, "user_id": user_id, "limit": limit}
+    binds = [bindparam("user_id", type_=UUID(as_uuid=True))]
+    if after is not None:
+        params["rank"], params["id"] = after
+        binds.append(bindparam("id", type_=UUID(as_uuid=True)))
+
+    statement = (
+        text(sql.format(after=AFTER_CLAUSE if after else ""))
+        .bindparams(*binds)
+        .columns(id=UUID(as_uuid=True), start_time=DateTime(timezone=True))
+    )
+    result = await db.execute(statement, params)
+    return result.all()
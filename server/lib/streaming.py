@@ -0,0 +1,106 @@
+from dataclasses import dataclass, replace
+from typing import Optional
+
+
+@dataclass
+class Segment:
+    start: float
+    end: float
+    text: str
+    confidence: Optional[float] = None
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+class StreamingTranscript:
+    # A segment is committed once it ends before the unstable tail of the
+    # window and two consecutive passes agree on it, or unconditionally once
+    # the uncommitted window grows past ``max_window`` seconds.
+
+    def __init__(self, overlap: float, commit_margin: float, max_window: float):
+        self.overlap = overlap
+        self.commit_margin = commit_margin
+        self.max_window = max_window
+        self.committed: list[Segment] = []
+        self.tentative: list[Segment] = []
+        self.committed_until = 0.0
+
+    @property
+    def window_start(self) -> float:
+        return max(0.0, self.committed_until - self.overlap)
+
+    @property
+    def committed_text(self) -> str:
+        return _join(self.committed)
+
+    @property
+    def text(self) -> str:
+        return _join(self.committed + self.tentative)
+
+    def update(
+        self,
+        segments: list[Segment],
+        window_start: float,
+        audio_end: float,
+        endpoint: Optional[float] = None,
+    ) -> list[Segment]:
+        hypothesis = self._absolute(segments, window_start)
+
+        if endpoint is not None:
+            # The speaker paused: everything spoken before the pause is final
+            # and anything decoded inside the silence is dropped.
+            spoken = [s for s in hypothesis if (s.start + s.end) / 2 <= endpoint]
+            committed = self._commit(spoken, len(spoken))
+            self.committed_until = max(self.committed_until, endpoint)
+            return committed
+
+        stable_until = audio_end - self.commit_margin
+        candidates = [s for s in hypothesis if s.end <= stable_until]
+
+        agreed = 0
+        for current, previous in zip(candidates, self.tentative):
+            if _normalize(current.text) != _normalize(previous.text):
+                break
+            agreed += 1
+
+        if audio_end - self.committed_until <= self.max_window:
+            return self._commit(hypothesis, agreed)
+
+        # Holding anything back could keep the window growing for as long as
+        # the speaker does, so commit it all.
+        committed = self._commit(hypothesis, len(hypothesis))
+        if audio_end - self.committed_until > self.max_window:
+            # Silence, or nothing decoded near the end; skip past it.
+            self.committed_until = max(self.committed_until, stable_until)
+        return committed
+
+    def advance(self, until: float) -> None:
+        if not self.tentative:
+            self.committed_until = max(self.committed_until, until)
+
+    def finalize(self, segments: list[Segment], window_start: float) -> list[Segment]:
+        hypothesis = self._absolute(segments, window_start)
+        return self._commit(hypothesis, len(hypothesis))
+
+    def _absolute(self, segments: list[Segment], window_start: float) -> list[Segment]:
+        shifted = [
+            replace(s, start=window_start + s.start, end=window_start + s.end)
+            for s in segments
+            if s.text.strip()
+        ]
+        # Segments that fall mostly inside the overlap were already committed.
+        return [s for s in shifted if (s.start + s.end) / 2 >= self.committed_until]
+
+    def _commit(self, hypothesis: list[Segment], count: int) -> list[Segment]:
+        newly_committed = hypothesis[:count]
+        self.committed.extend(newly_committed)
+        if newly_committed:
+            self.committed_until = max(self.committed_until, newly_committed[-1].end)
+        self.tentative = hypothesis[count:]
+        return newly_committed
+
+
+def _join(segments: list[Segment]) -> str:
+    return " ".join(s.text.strip() for s in segments)
@@ -0,0 +1,128 @@
+import random
+import time
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from datetime import UTC, datetime
+from typing import Optional
+
+from lib.config import settings
+
+# Chrome trace "threads" that group a session's spans into timeline rows.
+RECEIVE = 1
+TICK = 2
+THREAD_NAMES = {RECEIVE: "receive", TICK: "model"}
+
+
+class SessionTrace:
+    # Timestamped spans for one session, in Chrome trace-event form so an
+    # export loads straight into chrome://tracing or Perfetto.
+
+    def __init__(self, session_id: str, max_events: int):
+        self.session_id = session_id
+        self.max_events = max_events
+        self.started_at = datetime.now(UTC)
+        self.events: list[dict] = []
+        self.dropped = 0
+        self._origin = time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str, tid: int = TICK, **args):
+        started = time.perf_counter()
+        try:
+            yield args
+        finally:
+            self._add(
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": self._micros(started),
+                    "dur": round((time.perf_counter() - started) * 1e6),
+                    "tid": tid,
+                    "args": args,
+                }
+            )
+
+    def counter(self, name: str, **values: float) -> None:
+        self._add(
+            {
+                "name": name,
+                "ph": "C",
+                "ts": self._micros(time.perf_counter()),
+                "tid": TICK,
+                "args": values,
+            }
+        )
+
+    def to_chrome(self) -> dict:
+        names = [
+            {"name": "thread_name", "ph": "M", "tid": tid, "args": {"name": name}}
+            for tid, name in THREAD_NAMES.items()
+        ]
+        return {
+            "traceEvents": [{**event, "pid": 1} for event in names + self.events],
+            "displayTimeUnit": "ms",
+            "otherData": {
+                "session_id": self.session_id,
+                "started_at": self.started_at.isoformat(),
+                "dropped_events": self.dropped,
+            },
+        }
+
+    def _add(self, event: dict) -> None:
+        if len(self.events) >= self.max_events:
+            self.dropped += 1
+            return
+        self.events.append(event)
+
+    def _micros(self, at: float) -> int:
+        return round((at - self._origin) * 1e6)
+
+
+class NullTrace:
+    def span(self, name: str, tid: int = TICK, **args):
+        return nullcontext(args)
+
+    def counter(self, name: str, **values: float) -> None:
+        pass
+
+
+NULL_TRACE = NullTrace()
+
+
+class Tracer:
+    # Keeps the most recent ``capacity`` session traces, live or finished.
+
+    def __init__(self, capacity: int, sample_rate: float, max_events: int):
+        self.capacity = capacity
+        self.sample_rate = sample_rate
+        self.max_events = max_events
+        self._traces: OrderedDict[str, SessionTrace] = OrderedDict()
+
+    def start(self, session_id: str, forced: bool = False) -> SessionTrace | NullTrace:
+        if self.capacity <= 0 or not (forced or random.random() < self.sample_rate):
+            return NULL_TRACE
+        trace = SessionTrace(session_id, self.max_events)
+        self._traces[session_id] = trace
+        while len(self._traces) > self.capacity:
+            self._traces.popitem(last=False)
+        return trace
+
+    def get(self, session_id: str) -> Optional[SessionTrace]:
+        return self._traces.get(session_id)
+
+    def summaries(self) -> list[dict]:
+        return [
+            {
+                "session_id": trace.session_id,
+                "started_at": trace.started_at.isoformat(),
+                "events": len(trace.events),
+            }
+            for trace in reversed(self._traces.values())
+        ]
+
+
+tracer = Tracer(
+    capacity=settings.TRACE_BUFFER_SIZE,
+    sample_rate=settings.TRACE_SAMPLE_RATE,
+    max_events=settings.TRACE_MAX_EVENTS,
+)
@@ -1,110 +1,403 @@
 import asyncio
-import io
 import json
+import logging
+import secrets
+import time
+import uuid
 from datetime import UTC, datetime
-from typing import Optional, TypedDict, cast
+from typing import Optional, cast
 
-from fastapi import WebSocket, WebSocketDisconnect
-from faster_whisper import WhisperModel
+import numpy as np
+from fastapi import WebSocket, WebSocketDisconnect, status
 from sqlalchemy import UUID
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.models import Session as SessionModel
-from db.models import User
+from db.models import TranscriptSegment, User
+from lib.admission import AdmissionRefused, session_admission
+from lib.audio import AudioStore, StreamingDecoder, audio_memory
 from lib.config import settings
+from lib.metrics import (
+    active_sessions,
+    db_commit_seconds,
+    real_time_factor,
+    tick_inference_seconds,
+)
+from lib.pacing import TickPacer, cpu_pressure
+from lib.protocol import negotiate
+from lib.resume import parked_sessions
+from lib.scheduler import InferenceScheduler, TranscriptionResult
+from lib.streaming import Segment, StreamingTranscript
+from lib.tracing import NULL_TRACE, RECEIVE, NullTrace, SessionTrace, tracer
+from lib.vad import VoiceActivityDetector
 
+WEBM_MAGIC = b"\x1a\x45\xdf\xa3"
 
-class TranscriptionResult(TypedDict):
-    text: str
-    language: str
+logger = logging.getLogger(__name__)
 
 
 class TranscriptionService:
     def __init__(
         self,
         websocket: WebSocket,
-        model: WhisperModel,
-        db: Session,
+        scheduler: InferenceScheduler,
+        db: AsyncSession,
         user: User,
+        language: Optional[str] = None,
+        trace: bool = False,
     ):
         self.websocket = websocket
-        self.model = model
+        self.scheduler = scheduler
         self.db = db
         self.user = user
-        self.buffer = bytearray()
-        self.last_sent_len = 0
         self.start_time = datetime.now(UTC)
         self.final_transcript: str = ""
-        self.language: str = "en"
-        self.model_used: str = "faster-whisper-tiny"
-        self._partial_min_len = 1
+        self.language: str = language or "en"
+        self.language_probability: Optional[float] = None
+        self.detection_seconds_saved = 0.0
+        # A client-supplied language is trusted for the whole session; a
+        # detected one is pinned until the model's confidence collapses.
+        self._pinned_language = language
+        self._language_from_client = language is not None
+        self._detection_cost = 0.0
+        self.model_used: str = scheduler.model_name
+        self.transcript = StreamingTranscript(
+            overlap=settings.STREAM_OVERLAP_SECONDS,
+            commit_margin=settings.STREAM_COMMIT_MARGIN_SECONDS,
+            max_window=settings.STREAM_MAX_WINDOW_SECONDS,
+        )
+        self.vad: Optional[VoiceActivityDetector] = None
+        if settings.VAD_ENABLED:
+            self.vad = VoiceActivityDetector(
+                threshold=settings.VAD_ENERGY_THRESHOLD,
+                frame_ms=settings.VAD_FRAME_MS,
+                min_silence_ms=settings.VAD_MIN_SILENCE_MS,
+                speech_pad_ms=settings.VAD_SPEECH_PAD_MS,
+            )
+        self._speech_pending = False
+        self.pacer = TickPacer(
+            interval=settings.CHUNK_INTERVAL,
+            min_interval=settings.TICK_MIN_INTERVAL,
+            max_interval=settings.TICK_MAX_INTERVAL,
+            headroom=settings.TICK_LATENCY_HEADROOM,
+        )
+        self._last_audio_end = 0.0
+        self.session: Optional[SessionModel] = None
+        # Kept apart from the row: a rolled back flush expires it.
+        self.session_id: Optional[uuid.UUID] = None
+        self._pending_segments: list[tuple[int, Segment]] = []
+        self._segment_count = 0
+        self._last_flush = time.monotonic()
+        self._flush_task: Optional[asyncio.Task] = None
+        self.resume_token = secrets.token_urlsafe(24)
+        self.parked_until: Optional[float] = None
+        self._trace_requested = trace
+        self.trace: SessionTrace | NullTrace = NULL_TRACE
+        self._restarted = False
+        self._early_messages: list[dict] = []
 
     async def handle_websocket(self) -> None:
-        await self.websocket.accept()
+        self.protocol = negotiate(self.websocket)
+        await self.websocket.accept(subprotocol=self.protocol.subprotocol)
+        admitted = False
+        try:
+            admitted = await self._wait_for_admission()
+        except AdmissionRefused as refused:
+            await self.protocol.send(
+                {
+                    "type": "unavailable",
+                    "reason": refused.reason,
+                    "retry_after": refused.retry_after,
+                }
+            )
+            await self.websocket.close(
+                code=status.WS_1013_TRY_AGAIN_LATER, reason=refused.reason
+            )
+        except Exception:
+            # Typically the client left while in line and a "queued" update
+            # could not be sent; handled like a refusal.
+            pass
+        finally:
+            if not admitted and self.session is not None:
+                if not parked_sessions.park(self, self.parked_until):
+                    await self.finish_detached()
+        if not admitted:
+            return
+
+        try:
+            await self._serve()
+        finally:
+            session_admission.release(self.user.id)
+
+    async def _wait_for_admission(self) -> bool:
+        if session_admission.try_acquire(self.user.id, self.scheduler):
+            return True
+
+        # Keep reading while in line so a client that gives up is noticed;
+        # anything it sends meanwhile is replayed once the session starts.
+        admission = asyncio.create_task(
+            session_admission.acquire(self.user.id, self.scheduler, self._send_queued)
+        )
+        try:
+            while not admission.done():
+                receive = asyncio.create_task(self.websocket.receive())
+                await asyncio.wait(
+                    {admission, receive}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not receive.done():
+                    receive.cancel()
+                    break
+                message = receive.result()
+                if message["type"] == "websocket.disconnect":
+                    admission.cancel()
+                    try:
+                        await admission
+                    except (asyncio.CancelledError, Exception):
+                        return False
+                    # Admitted just as the client left.
+                    session_admission.release(self.user.id)
+                    return False
+                self._early_messages.append(message)
+        except BaseException:
+            if admission.done() and not admission.cancelled():
+                if admission.exception() is None:
+                    session_admission.release(self.user.id)
+            else:
+                admission.cancel()
+            raise
+        admission.result()
+        return True
+
+    async def _send_queued(self, position: int) -> None:
+        await self.protocol.send({"type": "queued", "position": position})
+
+    async def _serve(self) -> None:
+        if self.session is None:
+            self._open_audio()
+            try:
+                await self._create_session()
+                self.trace = tracer.start(str(self.session_id), self._trace_requested)
+                await self.protocol.send(
+                    {
+                        "type": "session",
+                        "session_id": str(self.session_id),
+                        "resume_token": self.resume_token,
+                    }
+                )
+            except BaseException:
+                self.audio.close()
+                raise
+        else:
+            await self.protocol.send(
+                self.protocol.resumed(str(self.session_id), self.transcript)
+            )
         model_task = asyncio.create_task(self._run_model_periodically())
+        active_sessions.inc()
 
+        disconnected = False
         try:
             while True:
-                message = await self.websocket.receive()
+                if self._early_messages:
+                    message = self._early_messages.pop(0)
+                else:
+                    message = await self.websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    disconnected = True
+                    break
                 if message.get("bytes"):
-                    self.buffer.extend(message["bytes"])
+                    with self.trace.span(
+                        "receive", RECEIVE, bytes=len(message["bytes"])
+                    ):
+                        await self._feed(message["bytes"])
+                    if self.decoder.error is not None:
+                        break
                 elif message.get("text"):
                     data = json.loads(message["text"])
                     if data.get("type") == "stop":
                         break
 
         except WebSocketDisconnect:
-            pass
+            disconnected = True
         finally:
+            active_sessions.dec()
             model_task.cancel()
             try:
                 await model_task
             except asyncio.CancelledError:
                 pass
+            except Exception:
+                # Usually a partial sent into a socket that just dropped;
+                # the session is still parked or finalized below.
+                logger.exception("Transcription loop failed for %s", self.session_id)
+            finally:
+                await self._park_or_finish(disconnected)
 
+    async def _park_or_finish(self, disconnected: bool) -> None:
+        if disconnected and parked_sessions.park(self):
+            return
+        try:
             await self._finalize_and_notify()
+        finally:
+            self.audio.close()
+
+    def _open_audio(self) -> None:
+        # Only once admitted: the store reserves from the shared memory budget.
+        self.audio = AudioStore(
+            settings.AUDIO_BUFFER_SECONDS,
+            spill_seconds=settings.AUDIO_SPILL_MAX_SECONDS,
+            budget=audio_memory,
+            # Enough to always hold a full streaming window plus its overlap.
+            min_capacity_seconds=2
+            * (settings.STREAM_MAX_WINDOW_SECONDS + settings.STREAM_OVERLAP_SECONDS),
+        )
+        self.decoder = StreamingDecoder(self.audio)
+
+    async def resume(self, websocket: WebSocket, db: AsyncSession) -> None:
+        await self._wait_for_flush()
+        self.websocket = websocket
+        self.db = db
+        self._restarted = True
+
+    async def finish_detached(self) -> None:
+        try:
+            await self._finalize_and_notify(notify=False)
+        finally:
+            self.audio.close()
+
+    async def _feed(self, data: bytes) -> None:
+        if self._restarted:
+            self._restarted = False
+            if data.startswith(WEBM_MAGIC):
+                # The client restarted its recorder instead of carrying on with
+                # the old stream; decode the new container after the old audio.
+                await asyncio.to_thread(self.decoder.close)
+                self.decoder = StreamingDecoder(self.audio)
+        self.decoder.feed(data)
 
     async def _run_model_periodically(self) -> None:
         while True:
-            await asyncio.sleep(settings.CHUNK_INTERVAL)
-            if not self.buffer:
+            pressure = max(self.scheduler.pressure, cpu_pressure())
+            await asyncio.sleep(self.pacer.next_interval(pressure))
+            if not self.audio.total_samples:
                 continue
 
-            result = await asyncio.to_thread(self._transcribe_audio, bytes(self.buffer))
+            with self.trace.span("tick") as span:
+                await self._tick(span)
 
-            new_text = result["text"][self.last_sent_len :]
-            if new_text and len(new_text) >= self._partial_min_len:
-                await self._send_partial(new_text)
-                self.last_sent_len = len(result["text"])
+    async def _tick(self, span: dict) -> None:
+        self.trace.counter(
+            "audio",
+            decoded_seconds=self.audio.duration,
+            lag_seconds=self.audio.duration - self._last_audio_end,
+        )
+        should_run, endpoint = self._check_speech()
+        span["speech"] = should_run
+        if not should_run:
+            # Segments committed at a pause still reach the database while
+            # the silence that follows is skipped.
+            self._maybe_flush_segments()
+            return
 
-            self.final_transcript = result["text"]
-            self.language = result["language"]
+        window_start, audio = self._window()
+        self._speech_pending = False
+        started = time.perf_counter()
+        result = await self._transcribe_audio(audio)
+        elapsed = time.perf_counter() - started
+        window_seconds = len(audio) / self.audio.sample_rate
+        tick_inference_seconds.observe(elapsed)
+        real_time_factor.observe(elapsed / window_seconds)
+        self._update_language(result, window_seconds)
+        audio_end = window_start + window_seconds
+        self.pacer.record(elapsed, audio_end - self._last_audio_end)
+        self._last_audio_end = audio_end
+        committed = self.transcript.update(
+            result["segments"], window_start, audio_end, endpoint
+        )
+        self._queue_segments(committed)
+        self._maybe_flush_segments()
 
-    def _transcribe_audio(self, audio_data: bytes) -> TranscriptionResult:
-        audio_file = io.BytesIO(audio_data)
-        try:
-            segments, info = self.model.transcribe(audio_file)
-            text = " ".join([segment.text for segment in segments])
-            return {
-                "text": text,
-                "language": info.language,
-            }
-        except Exception:
-            return {"text": "", "language": "en"}
+        update = self.protocol.update(self.transcript)
+        if update is not None:
+            with self.trace.span("send", type=update["type"]):
+                await self.protocol.send(update)
+
+        self.final_transcript = self.transcript.text
+
+    def _check_speech(self) -> tuple[bool, Optional[float]]:
+        if self.vad is None:
+            return True, None
+
+        start = max(self.vad.position, self.audio.start_time)
+        if self.vad.process(self.audio.read(start), start):
+            self._speech_pending = True
+        endpoint = self.vad.endpoint()
+
+        if self._speech_pending or (endpoint is not None and self.transcript.tentative):
+            return True, endpoint
+
+        # Nothing new was said; let the window slide past the silence.
+        self.transcript.advance(self.vad.position)
+        return False, None
+
+    def _window(self) -> tuple[float, np.ndarray]:
+        window_start = max(self.transcript.window_start, self.audio.start_time)
+        return window_start, self.audio.read(window_start)
 
-    async def _send_partial(self, new_text: str) -> None:
-        payload = {"type": "partial", "partial": new_text}
-        await self.websocket.send_json(payload)
+    async def _transcribe_audio(self, audio: np.ndarray) -> TranscriptionResult:
+        with self.trace.span(
+            "inference", window_seconds=len(audio) / self.audio.sample_rate
+        ) as span:
+            try:
+                result = await self.scheduler.transcribe(audio, self._pinned_language)
+            except Exception:
+                result = {"segments": [], "language": None}
+            span["segments"] = len(result["segments"])
+            return result
+
+    def _update_language(self, result: TranscriptionResult, seconds: float) -> None:
+        if "language_probability" in result:
+            self.language_probability = result["language_probability"]
+            self._detection_cost = result["detection_seconds"]
+            if (
+                seconds >= settings.LANGUAGE_DETECT_MIN_SECONDS
+                and self.language_probability >= settings.LANGUAGE_LOCK_MIN_PROBABILITY
+            ):
+                self._pinned_language = result["language"]
+        elif self._pinned_language is not None:
+            self.detection_seconds_saved += self._detection_cost
+            confidences = [
+                s.confidence for s in result["segments"] if s.confidence is not None
+            ]
+            if (
+                not self._language_from_client
+                and confidences
+                and sum(confidences) / len(confidences)
+                < settings.LANGUAGE_REDETECT_MAX_CONFIDENCE
+            ):
+                # Garbage out of a pinned language usually means the wrong
+                # one; detect again on the next tick.
+                self._pinned_language = None
+        if result["language"]:
+            self.language = result["language"]
+
+    async def _finalize_and_notify(self, notify: bool = True) -> None:
+        with self.trace.span("finalize", notify=notify):
+            await self._finalize(notify)
 
-    async def _finalize_and_notify(self) -> None:
-        if self.buffer:
-            result = await asyncio.to_thread(self._transcribe_audio, bytes(self.buffer))
-            if result["text"]:
-                self.final_transcript = result["text"]
-            if result.get("language"):
-                self.language = result["language"]
+    async def _finalize(self, notify: bool) -> None:
+        with self.trace.span("decode.flush"):
+            await asyncio.to_thread(self.decoder.close)
+        should_run, _ = self._check_speech()
+        if self.audio.total_samples and (should_run or self.transcript.tentative):
+            window_start, audio = self._window()
+            result = await self._transcribe_audio(audio)
+            self._update_language(result, len(audio) / self.audio.sample_rate)
+            committed = self.transcript.finalize(result["segments"], window_start)
+            self._queue_segments(committed)
+        self.final_transcript = self.transcript.committed_text
 
-        session_id, metadata = self._save_session()
+        with self.trace.span("save"):
+            session_id, metadata = await self._save_session()
 
         final_payload = {
             "type": "final",
@@ -114,31 +407,111 @@ class TranscriptionService:
             "words": metadata.get("word_count"),
             "duration_seconds": metadata.get("duration_seconds"),
             "language": self.language,
+            "language_probability": self.language_probability,
+            "detection_seconds_saved": round(self.detection_seconds_saved, 3),
             "model_used": self.model_used,
+            "error": (
+                "Could not decode audio" if self.decoder.error is not None else None
+            ),
         }
 
-        await self.websocket.send_json(final_payload)
-
-    def _save_session(self) -> tuple[Optional[UUID], dict]:
-        end_time = datetime.now(UTC)
-        duration = int((end_time - self.start_time).total_seconds())
-        word_count = len(self.final_transcript.split())
+        if notify:
+            with self.trace.span("send", type="final"):
+                await self.protocol.send(final_payload)
 
-        session = SessionModel(
+    async def _create_session(self) -> None:
+        # The row exists from the start so committed segments can be written
+        # through while the session is live and survive a crash.
+        self.session = SessionModel(
             user_id=self.user.id,
             start_time=self.start_time,
-            end_time=end_time,
-            duration_seconds=duration,
-            final_transcript=self.final_transcript,
-            word_count=word_count,
-            language=self.language,
+            end_time=self.start_time,
+            duration_seconds=0,
+            final_transcript="",
+            word_count=0,
             model_used=self.model_used,
         )
+        self.db.add(self.session)
+        await self.db.commit()
+        self.session_id = self.session.id
 
+    def _queue_segments(self, segments: list[Segment]) -> None:
+        for segment in segments:
+            self._pending_segments.append((self._segment_count, segment))
+            self._segment_count += 1
+
+    def _maybe_flush_segments(self) -> None:
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        if not self._pending_segments:
+            return
+        if (
+            len(self._pending_segments) < settings.SEGMENT_FLUSH_SIZE
+            and time.monotonic() - self._last_flush
+            < settings.SEGMENT_FLUSH_INTERVAL_SECONDS
+        ):
+            return
+        # Runs beside the tick loop so a slow insert never delays a partial,
+        # and is not cancelled with it so a commit is never cut off mid-way.
+        self._flush_task = asyncio.create_task(self._flush_segments())
+
+    async def _flush_segments(self) -> None:
+        pending, self._pending_segments = self._pending_segments, []
+        self._last_flush = time.monotonic()
+        try:
+            self.db.add_all(self._segment_rows(pending))
+            await self.db.commit()
+        except Exception:
+            self._pending_segments = pending + self._pending_segments
+            await self.db.rollback()
+
+    async def _wait_for_flush(self) -> None:
+        if self._flush_task is None:
+            return
+        try:
+            await self._flush_task
+        except Exception:
+            # Its segments are back in the queue for the next write.
+            pass
+
+    def _segment_rows(
+        self, segments: list[tuple[int, Segment]]
+    ) -> list[TranscriptSegment]:
+        return [
+            TranscriptSegment(
+                session_id=self.session_id,
+                position=position,
+                start=segment.start,
+                end=segment.end,
+                text=segment.text.strip(),
+                language=self.language,
+                confidence=segment.confidence,
+            )
+            for position, segment in segments
+        ]
+
+    async def _save_session(self) -> tuple[Optional[UUID], dict]:
+        await self._wait_for_flush()
+
+        end_time = datetime.now(UTC)
+        duration = int((end_time - self.start_time).total_seconds())
+        word_count = len(self.final_transcript.split())
+
+        session = self.session
+        # A resumed session saves through the new connection's DB session.
         self.db.add(session)
-        self.db.commit()
-        self.db.refresh(session)
-        session_id = session.id
+        session.end_time = end_time
+        session.duration_seconds = duration
+        session.final_transcript = self.final_transcript
+        session.word_count = word_count
+        session.language = self.language
+
+        self.db.add_all(self._segment_rows(self._pending_segments))
+        self._pending_segments = []
+        started = time.perf_counter()
+        await self.db.commit()
+        db_commit_seconds.observe(time.perf_counter() - started)
+        session_id = self.session_id
 
         metadata = {"duration_seconds": duration, "word_count": word_count}
 
@@ -0,0 +1,88 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import event, inspect
+
+from db.models import User
+from lib.config import settings
+
+
+class UserCache:
+    # Maps an already verified bearer token to a detached snapshot of its
+    # user, so authenticated requests skip both the JWT check and the user
+    # query. Entries never outlive the token's own expiry.
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, User]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[User]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, token: str, user: User, expires_at: Optional[float] = None) -> None:
+        if self.max_size <= 0:
+            return
+        deadline = time.time() + self.ttl
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+
+        snapshot = User(
+            id=user.id,
+            email=user.email,
+            password_hash=user.password_hash,
+            created_at=user.created_at,
+        )
+        with self._lock:
+            self._entries[token] = (deadline, snapshot)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id) -> None:
+        with self._lock:
+            for token in [t for t, (_, u) in self._entries.items() if u.id == user_id]:
+                del self._entries[token]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+user_cache = UserCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL_SECONDS)
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_deleted_user(mapper, connection, target: User) -> None:
+    user_cache.invalidate_user(target.id)
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_updated_user(mapper, connection, target: User) -> None:
+    if inspect(target).attrs.password_hash.history.has_changes():
+        user_cache.invalidate_user(target.id)
@@ -0,0 +1,86 @@
+from typing import Optional
+
+import numpy as np
+
+from lib.audio import SAMPLE_RATE, AudioStore
+
+
+def frame_energy(audio: np.ndarray, frame_size: int) -> np.ndarray:
+    frames = len(audio) // frame_size
+    return np.sqrt(
+        np.mean(np.square(audio[: frames * frame_size]).reshape(frames, -1), axis=1)
+    )
+
+
+def split_at_silence(
+    audio: AudioStore,
+    min_seconds: float,
+    max_seconds: float,
+    frame_ms: int,
+    pause_ms: int,
+) -> list[tuple[float, float]]:
+    # Cuts long recordings into chunks of at most ``max_seconds``, each cut
+    # placed in the quietest ``pause_ms`` stretch after ``min_seconds`` so
+    # that words are not split across chunks.
+    frame_size = int(audio.sample_rate * frame_ms / 1000)
+    frame_seconds = frame_size / audio.sample_rate
+    smoothing = np.ones(max(pause_ms // frame_ms, 1))
+    end = audio.duration
+    start = audio.start_time
+    chunks = []
+    while end - start > max_seconds:
+        search_start = start + min_seconds
+        energy = frame_energy(audio.read(search_start, start + max_seconds), frame_size)
+        if not len(energy):
+            break
+        quiet = np.convolve(energy, smoothing, mode="same")
+        cut = search_start + (int(np.argmin(quiet)) + 0.5) * frame_seconds
+        chunks.append((start, cut))
+        start = cut
+    chunks.append((start, end))
+    return chunks
+
+
+class VoiceActivityDetector:
+    # Frame-energy VAD fed incrementally with the audio that arrived since the
+    # previous call. It is cheap enough to run on every tick and tells the
+    # streaming loop whether there is anything new worth transcribing and
+    # where the speaker last paused.
+
+    def __init__(
+        self,
+        threshold: float,
+        frame_ms: int,
+        min_silence_ms: int,
+        speech_pad_ms: int,
+        sample_rate: int = SAMPLE_RATE,
+    ):
+        self.threshold = threshold
+        self.frame_size = int(sample_rate * frame_ms / 1000)
+        self.min_silence = min_silence_ms / 1000
+        self.speech_pad = speech_pad_ms / 1000
+        self.sample_rate = sample_rate
+        self.position = 0.0
+        self.last_speech_end: Optional[float] = None
+
+    def process(self, audio: np.ndarray, start: float) -> bool:
+        frames = len(audio) // self.frame_size
+        self.position = start + frames * self.frame_size / self.sample_rate
+        if not frames:
+            return False
+
+        energy = frame_energy(audio, self.frame_size)
+        speech = np.flatnonzero(energy > self.threshold)
+        if not len(speech):
+            return False
+
+        last_frame = int(speech[-1]) + 1
+        self.last_speech_end = start + last_frame * self.frame_size / self.sample_rate
+        return True
+
+    def endpoint(self) -> Optional[float]:
+        if self.last_speech_end is None:
+            return None
+        if self.position - self.last_speech_end < self.min_silence:
+            return None
+        return self.last_speech_end + self.speech_pad
@@ -0,0 +1,15 @@
+import numpy as np
+
+from lib.audio import SAMPLE_RATE
+from lib.scheduler import get_scheduler
+
+
+def synthetic_audio(seconds: float = 1.0) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return rng.normal(0, 0.01, int(seconds * SAMPLE_RATE)).astype(np.float32)
+
+
+async def warm_up_models(tiers: list[str]) -> None:
+    audio = synthetic_audio()
+    for tier in tiers:
+        await get_scheduler(tier).warmup(audio)
@@ -0,0 +1,266 @@
+import asyncio
+import multiprocessing
+import queue
+import signal
+import threading
+import time
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from lib.audio import SAMPLE_RATE
+from lib.inference import TranscriptionResult
+
+
+class WorkerError(Exception):
+    pass
+
+
+def _worker_main(
+    conn: Connection, shm_name: str, capacity: int, loader: Callable[[], Any]
+) -> None:
+    # Shutdown is driven by the parent, not by the terminal's Ctrl-C.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    shm = SharedMemory(name=shm_name)
+    audio = np.ndarray((capacity,), dtype=np.float32, buffer=shm.buf)
+    engine = loader()
+    conn.send(("ready", None))
+
+    while True:
+        try:
+            command, payload = conn.recv()
+        except EOFError:
+            break
+
+        if command == "stop":
+            break
+        if command == "ping":
+            conn.send(("pong", None))
+        elif command == "batch":
+            lengths, languages = payload
+            offsets = np.cumsum([0] + lengths)
+            windows = [audio[offsets[i] : offsets[i + 1]] for i in range(len(lengths))]
+            try:
+                conn.send(("ok", engine.transcribe_batch(windows, languages)))
+            except Exception as exc:
+                conn.send(("error", repr(exc)))
+            del windows
+
+    del audio
+    shm.close()
+
+
+class _Worker:
+    def __init__(self, context, loader: Callable[[], Any], capacity: int):
+        self.capacity = capacity
+        self.shm = SharedMemory(create=True, size=capacity * 4)
+        self.audio = np.ndarray((capacity,), dtype=np.float32, buffer=self.shm.buf)
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, self.shm.name, capacity, loader),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+    def wait_ready(self) -> None:
+        status, _ = self._receive(None)
+        if status != "ready":
+            raise WorkerError(f"unexpected worker status {status!r}")
+
+    def ping(self, timeout: float) -> None:
+        if not self.process.is_alive():
+            raise WorkerError("worker process exited")
+        self.conn.send(("ping", None))
+        self._receive(timeout)
+
+    def transcribe_batch(
+        self,
+        windows: list[np.ndarray],
+        languages: list[Optional[str]],
+        timeout: float,
+    ) -> list[TranscriptionResult]:
+        lengths = [len(window) for window in windows]
+        if sum(lengths) > self.capacity:
+            raise ValueError("batch does not fit in the worker's shared memory")
+
+        offset = 0
+        for window in windows:
+            self.audio[offset : offset + len(window)] = window
+            offset += len(window)
+
+        try:
+            self.conn.send(("batch", (lengths, languages)))
+        except (BrokenPipeError, OSError) as exc:
+            raise WorkerError("worker process exited") from exc
+
+        status, result = self._receive(timeout)
+        if status == "error":
+            raise RuntimeError(result)
+        return result
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(("stop", None))
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+        del self.audio
+        self.shm.close()
+        self.shm.unlink()
+
+    def _receive(self, timeout: Optional[float]) -> tuple[str, Any]:
+        if not self.conn.poll(timeout):
+            raise WorkerError("worker timed out")
+        try:
+            return self.conn.recv()
+        except EOFError as exc:
+            raise WorkerError("worker process exited") from exc
+
+
+class InferenceWorkerPool:
+    # Runs inference in separate processes that each load the model once.
+    # Audio crosses the process boundary through a per-worker shared memory
+    # block; only lengths, languages and the small results are pickled.
+
+    def __init__(
+        self,
+        size: int,
+        loader: Callable[[], Any],
+        capacity_seconds: float,
+        timeout: float,
+        health_interval: float,
+    ):
+        self.concurrency = size
+        self.loader = loader
+        self.capacity = int(capacity_seconds * SAMPLE_RATE)
+        self.timeout = timeout
+        self.health_interval = health_interval
+        self.restarts = 0
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: queue.Queue[_Worker] = queue.Queue()
+        self._workers: set[_Worker] = set()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._started = False
+
+    @property
+    def alive_workers(self) -> int:
+        with self._lock:
+            return sum(worker.process.is_alive() for worker in self._workers)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._started:
+                return
+            workers = [self._spawn() for _ in range(self.concurrency)]
+            try:
+                for worker in workers:
+                    worker.wait_ready()
+            except WorkerError:
+                for worker in workers:
+                    worker.stop()
+                raise
+            for worker in workers:
+                self._workers.add(worker)
+                self._idle.put(worker)
+            threading.Thread(
+                target=self._monitor, args=(self._generation,), daemon=True
+            ).start()
+            self._started = True
+
+    async def transcribe_batch(
+        self, windows: list[np.ndarray], languages: list[Optional[str]]
+    ) -> list[TranscriptionResult]:
+        if not self._started:
+            await asyncio.to_thread(self.start)
+        return await asyncio.to_thread(self._run_batch, windows, languages)
+
+    async def warmup(self, audio: np.ndarray) -> None:
+        await asyncio.to_thread(self._warm_up, audio)
+
+    def check_health(self) -> None:
+        idle, generation = self._idle, self._generation
+        for _ in range(idle.qsize()):
+            try:
+                worker = idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                worker.ping(self.timeout)
+            except WorkerError:
+                worker = self._restart(worker, generation)
+            finally:
+                idle.put(worker)
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self.shutdown)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+            self._idle = queue.Queue()
+            self._generation += 1
+            self._started = False
+        for worker in workers:
+            worker.stop()
+
+    def _run_batch(
+        self, windows: list[np.ndarray], languages: list[Optional[str]]
+    ) -> list[TranscriptionResult]:
+        idle, generation = self._idle, self._generation
+        worker = idle.get()
+        try:
+            return worker.transcribe_batch(windows, languages, self.timeout)
+        except WorkerError:
+            worker = self._restart(worker, generation)
+            raise
+        finally:
+            idle.put(worker)
+
+    def _warm_up(self, audio: np.ndarray) -> None:
+        self.start()
+        idle = self._idle
+        workers = [idle.get() for _ in range(self.concurrency)]
+        try:
+            for worker in workers:
+                worker.transcribe_batch([audio], [None], self.timeout)
+        finally:
+            for worker in workers:
+                idle.put(worker)
+
+    def _monitor(self, generation: int) -> None:
+        while self._generation == generation:
+            time.sleep(self.health_interval)
+            if self._generation == generation:
+                self.check_health()
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._context, self.loader, self.capacity)
+
+    def _restart(self, worker: _Worker, generation: int) -> _Worker:
+        with self._lock:
+            if generation != self._generation:
+                return worker
+            self._workers.discard(worker)
+        worker.stop()
+
+        replacement = self._spawn()
+        with self._lock:
+            self._workers.add(replacement)
+            self.restarts += 1
+        try:
+            replacement.wait_ready()
+        except WorkerError:
+            # Left in the pool; the health check restarts it again later.
+            pass
+        return replacement
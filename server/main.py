@@ -1,12 +1,54 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from lib.config import settings
+from lib.hashing import stop_password_hasher
+from lib.jobs import job_manager
+from lib.metrics import render as render_metrics
+from lib.model import registry
+from lib.resume import parked_sessions
+from lib.scheduler import stop_schedulers
+from lib.warmup import warm_up_models
+from routes.admin import router as admin_router
 from routes.auth import router as auth_router
+from routes.jobs import router as jobs_router
 from routes.sessions import router as sessions_router
 from routes.transcription import router as transcription_router
 
-app = FastAPI()
+
+async def warm_up(app: FastAPI) -> None:
+    try:
+        await warm_up_models(settings.PRELOAD_MODEL_TIERS)
+    except Exception as exc:
+        app.state.warmup_error = repr(exc)
+        return
+    app.state.ready = True
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.ready = False
+    app.state.warmup_error = None
+    warmup_task = asyncio.create_task(warm_up(app))
+    try:
+        yield
+    finally:
+        warmup_task.cancel()
+        try:
+            await warmup_task
+        except asyncio.CancelledError:
+            pass
+        await job_manager.shutdown()
+        await parked_sessions.shutdown()
+        await stop_schedulers()
+        stop_password_hasher()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -19,6 +61,8 @@ app.add_middleware(
 app.include_router(auth_router, prefix="/auth", tags=["auth"])
 app.include_router(sessions_router, prefix="/sessions", tags=["sessions"])
 app.include_router(transcription_router, prefix="/ws", tags=["transcription"])
+app.include_router(jobs_router, prefix="/jobs", tags=["jobs"])
+app.include_router(admin_router, prefix="/admin", tags=["admin"])
 
 
 @app.get("/health")
@@ -26,6 +70,26 @@ def read_health():
     return {"status": "ok", "message": "Transcribe Server Running on port 8000"}
 
 
+@app.get("/health/live")
+def read_liveness():
+    return {"status": "ok"}
+
+
+@app.get("/health/ready")
+def read_readiness():
+    if not app.state.ready:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "starting", "error": app.state.warmup_error},
+        )
+    return {"status": "ready", "models": registry.loaded}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def read_metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/")
 def read_root():
     return {"message": "Transcribe Server Running on port 8000"}
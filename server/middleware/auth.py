@@ -1,24 +1,36 @@
+import secrets
 import uuid
-from fastapi import Depends, HTTPException
+from typing import Optional
+
+from fastapi import Depends, Header, HTTPException
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
-from db.base import get_db
+from db.base import get_async_db
 from db.models import User
 from lib.auth import decode_access_token
+from lib.config import settings
+from lib.metrics import auth_seconds, timed
+from lib.user_cache import user_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+@timed(auth_seconds)
+async def get_current_user(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
 ) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    user = user_cache.get(token)
+    if user is not None:
+        return user
+
     payload = decode_access_token(token)
     if payload is None:
         raise credentials_exception
@@ -32,7 +44,18 @@ def get_current_user(
     except ValueError:
         raise credentials_exception
 
-    user = db.query(User).filter(User.id == user_id).first()
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalars().first()
     if user is None:
         raise credentials_exception
+    user_cache.set(token, user, payload.get("exp"))
     return user
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    if (
+        not settings.ADMIN_TOKEN
+        or x_admin_token is None
+        or not secrets.compare_digest(x_admin_token, settings.ADMIN_TOKEN)
+    ):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
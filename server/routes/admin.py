@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, HTTPException
+
+from lib.tracing import tracer
+from lib.user_cache import user_cache
+from middleware.auth import require_admin
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/stats")
+def read_stats():
+    return {"user_cache": user_cache.stats()}
+
+
+@router.get("/traces")
+def list_traces():
+    return {"traces": tracer.summaries()}
+
+
+@router.get("/traces/{session_id}")
+def read_trace(session_id: str):
+    trace = tracer.get(session_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return trace.to_chrome()
@@ -1,9 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from db.base import get_db
+from db.base import get_async_db
 from db.models import User
-from lib.auth import create_access_token, get_password_hash, verify_password
+from lib.auth import create_access_token
+from lib.config import settings
+from lib.hashing import HasherBusy, PasswordHasher, get_password_hasher
 from middleware.auth import get_current_user
 from schemas.auth import UserLogin, UserSignup
 from schemas.response import (
@@ -18,17 +21,32 @@ from schemas.user import UserSchema
 router = APIRouter()
 
 
+def busy_exception() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Server busy, please retry",
+        headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER_SECONDS)},
+    )
+
+
 @router.post("/signup", response_model=SignUpResponse)
-def signup(user: UserSignup, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == user.email).first()
-    if db_user:
+async def signup(
+    user: UserSignup,
+    db: AsyncSession = Depends(get_async_db),
+    hasher: PasswordHasher = Depends(get_password_hasher),
+):
+    result = await db.execute(select(User).where(User.email == user.email))
+    if result.scalars().first():
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    hashed_password = get_password_hash(user.password)
+    try:
+        hashed_password = await hasher.hash(user.password)
+    except HasherBusy:
+        raise busy_exception()
     new_user = User(email=user.email, password_hash=hashed_password)
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
 
     access_token = create_access_token(data={"sub": str(new_user.id)})
 
@@ -41,11 +59,20 @@ def signup(user: UserSignup, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=LoginResponse)
-def login(user: UserLogin, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == user.email).first()
+async def login(
+    user: UserLogin,
+    db: AsyncSession = Depends(get_async_db),
+    hasher: PasswordHasher = Depends(get_password_hasher),
+):
+    result = await db.execute(select(User).where(User.email == user.email))
+    db_user = result.scalars().first()
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
-    if not verify_password(user.password, db_user.password_hash):
+    try:
+        valid = await hasher.verify(user.password, db_user.password_hash)
+    except HasherBusy:
+        raise busy_exception()
+    if not valid:
         raise HTTPException(status_code=400, detail="Invalid credentials")
 
     access_token = create_access_token(data={"sub": str(db_user.id)})
@@ -0,0 +1,116 @@
+import os
+import tempfile
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from faster_whisper.tokenizer import _LANGUAGE_CODES
+
+from db.models import User
+from lib.config import settings
+from lib.jobs import Job, JobManager, JobQueueFull, get_job_manager
+from lib.model import registry
+from lib.scheduler import InferenceScheduler, get_scheduler
+from middleware.auth import get_current_user
+from schemas.job import JobSchema
+from schemas.response import JobResponse
+
+router = APIRouter()
+
+
+def get_job_scheduler(model: Optional[str] = None) -> InferenceScheduler:
+    tier = model or settings.DEFAULT_MODEL_TIER
+    if tier not in registry:
+        raise HTTPException(status_code=400, detail="Unknown model tier")
+    return get_scheduler(tier)
+
+
+def get_job_language(language: Optional[str] = None) -> Optional[str]:
+    if language is not None and language not in _LANGUAGE_CODES:
+        raise HTTPException(status_code=400, detail="Unsupported language")
+    return language
+
+
+async def receive_upload(request: Request) -> str:
+    # The body is the raw audio file, streamed to disk as it arrives.
+    limit = settings.JOB_MAX_UPLOAD_MB * 1024 * 1024
+    declared = request.headers.get("content-length")
+    if declared is not None:
+        try:
+            declared_bytes = int(declared)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid Content-Length")
+        if declared_bytes > limit:
+            raise HTTPException(status_code=413, detail="Upload too large")
+
+    fd, path = tempfile.mkstemp(suffix=".upload")
+    received = 0
+    try:
+        with os.fdopen(fd, "wb") as upload:
+            async for chunk in request.stream():
+                received += len(chunk)
+                if received > limit:
+                    raise HTTPException(status_code=413, detail="Upload too large")
+                upload.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    if not received:
+        os.remove(path)
+        raise HTTPException(status_code=400, detail="Empty upload")
+    return path
+
+
+@router.post("/", response_model=JobResponse, status_code=202)
+async def create_job(
+    request: Request,
+    language: Optional[str] = Depends(get_job_language),
+    scheduler: InferenceScheduler = Depends(get_job_scheduler),
+    manager: JobManager = Depends(get_job_manager),
+    current_user: User = Depends(get_current_user),
+):
+    path = await receive_upload(request)
+    job = Job(
+        user_id=current_user.id, path=path, scheduler=scheduler, language=language
+    )
+    try:
+        manager.submit(job)
+    except JobQueueFull:
+        os.remove(path)
+        raise HTTPException(
+            status_code=503,
+            detail="Too many pending jobs, please retry",
+            headers={"Retry-After": "30"},
+        )
+    return JobResponse(
+        message="Job created successfully", data=JobSchema.model_validate(job)
+    )
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: UUID,
+    manager: JobManager = Depends(get_job_manager),
+    current_user: User = Depends(get_current_user),
+):
+    job = manager.get(job_id, current_user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobResponse(
+        message="Job retrieved successfully", data=JobSchema.model_validate(job)
+    )
+
+
+@router.delete("/{job_id}", response_model=JobResponse)
+async def cancel_job(
+    job_id: UUID,
+    manager: JobManager = Depends(get_job_manager),
+    current_user: User = Depends(get_current_user),
+):
+    job = manager.get(job_id, current_user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    manager.cancel(job)
+    return JobResponse(
+        message="Job cancellation requested", data=JobSchema.model_validate(job)
+    )
@@ -1,49 +1,134 @@
+from datetime import datetime
+from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from db.base import get_db
+from db.base import get_async_db
 from db.models import Session as SessionModel
-from db.models import User
+from db.models import TranscriptSegment, User
+from lib.pagination import decode_cursor, encode_cursor
+from lib.search import search_sessions
 from middleware.auth import get_current_user
-from schemas.response import BaseResponse, SessionResponse, SingleSessionResponse
-from schemas.session import SessionSchema
+from schemas.response import (
+    BaseResponse,
+    SessionResponse,
+    SessionSearchResponse,
+    SingleSessionResponse,
+)
+from schemas.session import (
+    SessionSchema,
+    SessionSearchResult,
+    SessionSummarySchema,
+    TranscriptSegmentSchema,
+)
 
 router = APIRouter()
 
+SUMMARY_FIELDS = list(SessionSummarySchema.model_fields)
+SEGMENT_BATCH_SIZE = 500
 
-@router.get("/", response_model=SessionResponse)
-def get_sessions(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+
+def parse_fields(fields: Optional[str] = None) -> list[str]:
+    if fields is None:
+        return SUMMARY_FIELDS
+    selected = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in selected if field not in SUMMARY_FIELDS]
+    if unknown or not selected:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    return selected
+
+
+@router.get("/", response_model=SessionResponse, response_model_exclude_unset=True)
+async def get_sessions(
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = None,
+    fields: list[str] = Depends(parse_fields),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    sessions = (
-        db.query(SessionModel)
-        .filter(SessionModel.user_id == current_user.id)
-        .offset(skip)
-        .limit(limit)
-        .all()
+    # The cursor needs (start_time, id) even when the client did not ask for
+    # them; they are fetched but left out of the response.
+    columns = list(dict.fromkeys(fields + ["start_time", "id"]))
+    query = select(*(getattr(SessionModel, column) for column in columns)).where(
+        SessionModel.user_id == current_user.id
     )
+    position = decode_cursor(cursor, 2)
+    if position is not None:
+        try:
+            start_time = datetime.fromisoformat(position[0])
+            session_id = UUID(position[1])
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(
+            tuple_(SessionModel.start_time, SessionModel.id) < (start_time, session_id)
+        )
+
+    result = await db.execute(
+        query.order_by(SessionModel.start_time.desc(), SessionModel.id.desc()).limit(
+            limit + 1
+        )
+    )
+    rows = result.all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].start_time.isoformat(), rows[-1].id)
     return SessionResponse(
         message="Sessions retrieved successfully",
-        data=[SessionSchema.model_validate(s) for s in sessions[::-1]],
+        data=[
+            SessionSummarySchema(**{field: row._mapping[field] for field in fields})
+            for row in rows
+        ],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/search", response_model=SessionSearchResponse)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    after = None
+    position = decode_cursor(cursor, 2)
+    if position is not None:
+        try:
+            after = (float(position[0]), UUID(position[1]))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    rows = await search_sessions(db, current_user.id, q, limit + 1, after)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(repr(rows[-1].rank), rows[-1].id)
+    return SessionSearchResponse(
+        message="Sessions retrieved successfully",
+        data=[SessionSearchResult.model_validate(row) for row in rows],
+        next_cursor=next_cursor,
     )
 
 
 @router.get("/{session_id}", response_model=SingleSessionResponse)
-def get_session(
+async def get_session(
     session_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    session = (
-        db.query(SessionModel)
-        .filter(SessionModel.id == session_id, SessionModel.user_id == current_user.id)
-        .first()
+    result = await db.execute(
+        select(SessionModel).where(
+            SessionModel.id == session_id, SessionModel.user_id == current_user.id
+        )
     )
+    session = result.scalars().first()
     if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
 
@@ -53,22 +138,52 @@ def get_session(
     )
 
 
-@router.delete("/{session_id}", response_model=BaseResponse)
-def delete_session(
+@router.get("/{session_id}/segments")
+async def get_session_segments(
     session_id: UUID,
-    db: Session = Depends(get_db),
+    after: int = -1,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    session = (
-        db.query(SessionModel)
-        .filter(SessionModel.id == session_id, SessionModel.user_id == current_user.id)
-        .first()
+    result = await db.execute(
+        select(SessionModel.id).where(
+            SessionModel.id == session_id, SessionModel.user_id == current_user.id
+        )
     )
-    if session is None:
+    if result.scalar() is None:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    db.delete(session)
-    db.commit()
+    async def lines():
+        rows = await db.stream_scalars(
+            select(TranscriptSegment)
+            .where(
+                TranscriptSegment.session_id == session_id,
+                TranscriptSegment.position > after,
+            )
+            .order_by(TranscriptSegment.position)
+            .execution_options(yield_per=SEGMENT_BATCH_SIZE)
+        )
+        async for segment in rows:
+            yield TranscriptSegmentSchema.model_validate(segment).model_dump_json()
+            yield "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.delete("/{session_id}", response_model=BaseResponse)
+async def delete_session(
+    session_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    result = await db.execute(
+        delete(SessionModel).where(
+            SessionModel.id == session_id, SessionModel.user_id == current_user.id
+        )
+    )
+    if result.rowcount == 0:
+        raise HTTPException(status_code=404, detail="Session not found")
+    await db.commit()
 
     return BaseResponse(
         message="Session deleted successfully",
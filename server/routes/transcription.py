@@ -1,29 +1,59 @@
-from fastapi import APIRouter, Depends, Query, WebSocket, status
-from faster_whisper.transcribe import WhisperModel
-from sqlalchemy.orm import Session
+from typing import Optional
 
-from db.base import get_db
+from fastapi import APIRouter, Depends, Query, WebSocket, WebSocketException, status
+from faster_whisper.tokenizer import _LANGUAGE_CODES
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.base import get_async_db
 from lib.auth import get_user_from_token
-from lib.model import get_model
+from lib.resume import parked_sessions
+from lib.scheduler import InferenceScheduler, get_session_scheduler
 from lib.transcription import TranscriptionService
 
 router = APIRouter()
 
 
+def get_session_language(language: Optional[str] = Query(None)) -> Optional[str]:
+    if language is not None and language not in _LANGUAGE_CODES:
+        raise WebSocketException(
+            code=status.WS_1008_POLICY_VIOLATION, reason="Unsupported language"
+        )
+    return language
+
+
 @router.websocket(
     "/transcribe",
 )
 async def websocket_endpoint(
     websocket: WebSocket,
     token: str = Query(...),
-    model: WhisperModel = Depends(get_model),
-    db: Session = Depends(get_db),
+    resume: Optional[str] = Query(None),
+    language: Optional[str] = Depends(get_session_language),
+    trace: bool = Query(False),
+    scheduler: InferenceScheduler = Depends(get_session_scheduler),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    user = get_user_from_token(token, db)
+    user = await get_user_from_token(token, db)
 
     if user is None:
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
         return
 
-    transcription_service = TranscriptionService(websocket, model, db, user)
+    # Hand the connection back to the pool for the lifetime of the socket;
+    # the session checks one out again for the final save.
+    await db.close()
+
+    if resume is not None:
+        transcription_service = parked_sessions.take(resume, user.id)
+        if transcription_service is None:
+            await websocket.close(
+                code=status.WS_1008_POLICY_VIOLATION,
+                reason="Session cannot be resumed",
+            )
+            return
+        await transcription_service.resume(websocket, db)
+    else:
+        transcription_service = TranscriptionService(
+            websocket, scheduler, db, user, language, trace
+        )
     await transcription_service.handle_websocket()
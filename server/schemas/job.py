@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class JobSchema(BaseModel):
+    id: UUID
+    status: str
+    progress: float
+    chunks_total: int
+    chunks_done: int
+    duration_seconds: Optional[float] = None
+    session_id: Optional[UUID] = None
+    error: Optional[str] = None
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
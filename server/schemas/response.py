@@ -2,7 +2,8 @@ from typing import Any, Optional
 
 from pydantic import BaseModel
 
-from schemas.session import SessionSchema
+from schemas.job import JobSchema
+from schemas.session import SessionSchema, SessionSearchResult, SessionSummarySchema
 from schemas.user import UserSchema
 
 
@@ -15,13 +16,23 @@ class Response(BaseResponse):
 
 
 class SessionResponse(BaseResponse):
-    data: list[SessionSchema] = []
+    data: list[SessionSummarySchema] = []
+    next_cursor: Optional[str] = None
+
+
+class SessionSearchResponse(BaseResponse):
+    data: list[SessionSearchResult] = []
+    next_cursor: Optional[str] = None
 
 
 class SingleSessionResponse(BaseResponse):
     data: SessionSchema
 
 
+class JobResponse(BaseResponse):
+    data: JobSchema
+
+
 class SignUpResponseData(BaseModel):
     access_token: str
     user: UserSchema
@@ -19,3 +19,41 @@ class SessionSchema(BaseModel):
     updated_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class SessionSummarySchema(BaseModel):
+    id: Optional[UUID] = None
+    user_id: Optional[UUID] = None
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    duration_seconds: Optional[int] = None
+    word_count: Optional[int] = None
+    language: Optional[str] = None
+    model_used: Optional[str] = None
+    snippet: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class TranscriptSegmentSchema(BaseModel):
+    position: int
+    start: float
+    end: float
+    text: str
+    language: Optional[str] = None
+    confidence: Optional[float] = None
+
+    model_config = {"from_attributes": True}
+
+
+class SessionSearchResult(BaseModel):
+    id: UUID
+    start_time: datetime
+    duration_seconds: int
+    word_count: int
+    language: Optional[str] = None
+    snippet: Optional[str] = None
+    highlight: str
+    rank: float
+
+    model_config = {"from_attributes": True}
@@ -1,24 +1,46 @@
+import os
+import tempfile
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 
-from db.base import Base, get_db
+from db.base import Base, get_async_db, get_db
+from lib.config import settings
+from lib.jobs import job_manager
+from lib.user_cache import user_cache
 from main import app
 
-SQLALCHEMY_DATABASE_URL = "sqlite://"
+# The sync fixtures and the async app share one SQLite file, so rows written
+# by a test are visible to the routes under test.
+_db_fd, _db_path = tempfile.mkstemp(suffix=".db")
+os.close(_db_fd)
+
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{_db_path}"
+ASYNC_SQLALCHEMY_DATABASE_URL = f"sqlite+aiosqlite:///{_db_path}"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
+    poolclass=NullPool,
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL, poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
 
 Base.metadata.create_all(bind=engine)
 
+settings.PRELOAD_MODEL_TIERS = []
+settings.BCRYPT_ROUNDS = 4
+settings.PASSWORD_HASH_USE_PROCESSES = False
+
 
 def override_get_db():
     db = None
@@ -30,12 +52,20 @@ def override_get_db():
             db.close()
 
 
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
+job_manager.session_factory = TestingAsyncSessionLocal
 
 
 @pytest.fixture()
 def client():
     Base.metadata.create_all(bind=engine)
+    user_cache.clear()
     with TestClient(app) as c:
         yield c
     Base.metadata.drop_all(bind=engine)
@@ -48,3 +78,7 @@ def db_session():
         yield db
     finally:
         db.close()
+
+
+def pytest_sessionfinish(session, exitstatus):
+    os.remove(_db_path)
@@ -0,0 +1,118 @@
+import io
+
+import av
+import numpy as np
+
+from lib.audio import SAMPLE_RATE, AudioMemoryBudget, AudioStore, StreamingDecoder
+
+
+def encode_webm(seconds: float, rate: int = 48000, silence: float = 0.0) -> bytes:
+    output = io.BytesIO()
+    with av.open(output, mode="w", format="webm") as container:
+        stream = container.add_stream("libopus", rate=rate)
+        stream.layout = "mono"
+        t = np.arange(int(seconds * rate)) / rate
+        signal = (0.3 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+        signal = np.concatenate([signal, np.zeros(int(silence * rate), np.float32)])
+        for i in range(0, len(signal), 960):
+            frame = av.AudioFrame.from_ndarray(
+                signal[i : i + 960].reshape(1, -1), format="flt", layout="mono"
+            )
+            frame.sample_rate = rate
+            for packet in stream.encode(frame):
+                container.mux(packet)
+        for packet in stream.encode(None):
+            container.mux(packet)
+    return output.getvalue()
+
+
+def test_store_keeps_hot_window_in_memory_without_spill():
+    store = AudioStore(capacity_seconds=1, sample_rate=10)
+    store.append(np.arange(8, dtype=np.float32))
+    store.append(np.arange(8, 14, dtype=np.float32))
+
+    assert store.total_samples == 14
+    assert store.start_time == 0.5
+    np.testing.assert_array_equal(store.read(0), np.arange(5, 14))
+    np.testing.assert_array_equal(store.read(0.9, 1.2), np.arange(9, 12))
+
+
+def test_store_spills_older_audio_to_disk():
+    store = AudioStore(capacity_seconds=1, sample_rate=10, spill_seconds=100)
+    for i in range(0, 100, 7):
+        store.append(np.arange(i, min(i + 7, 100), dtype=np.float32))
+
+    assert store.start_time == 0
+    assert store.memory_bytes == 10 * 4
+    assert store.spilled_bytes > 0
+    np.testing.assert_array_equal(store.read(0), np.arange(100))
+    np.testing.assert_array_equal(store.read(2, 3), np.arange(20, 30))
+    store.close()
+
+
+def test_store_reads_are_views_that_survive_appends():
+    store = AudioStore(capacity_seconds=1, sample_rate=10, spill_seconds=100)
+    store.append(np.arange(8, dtype=np.float32))
+    hot = store.read(0.5)
+    assert not hot.flags.owndata
+    assert not hot.flags.writeable
+
+    store.append(np.arange(8, 30, dtype=np.float32))
+    cold = store.read(0, 0.5)
+    store.append(np.arange(30, 60, dtype=np.float32))
+
+    np.testing.assert_array_equal(hot, np.arange(5, 8))
+    np.testing.assert_array_equal(cold, np.arange(5))
+    np.testing.assert_array_equal(store.read(0, 0.5), np.arange(5))
+    store.close()
+
+
+def test_store_drops_spill_past_disk_cap():
+    store = AudioStore(capacity_seconds=1, sample_rate=10, spill_seconds=2)
+    store.append(np.arange(60, dtype=np.float32))
+
+    assert store.spilled_bytes <= 20 * 4
+    assert store.start_time > 0
+    first = int(store.start_time * 10)
+    np.testing.assert_array_equal(store.read(0), np.arange(first, 60))
+    store.close()
+
+
+def test_memory_budget_shrinks_later_sessions():
+    budget = AudioMemoryBudget(limit_bytes=100 * 4)
+    first = AudioStore(capacity_seconds=8, sample_rate=10, budget=budget)
+    second = AudioStore(
+        capacity_seconds=8, sample_rate=10, budget=budget, min_capacity_seconds=3
+    )
+
+    assert first.capacity == 80
+    assert second.capacity == 30
+    first.close()
+    second.close()
+    assert budget.used_bytes == 0
+
+
+def test_decoder_consumes_container_incrementally():
+    data = encode_webm(2.0)
+    buffer = AudioStore(capacity_seconds=10)
+    decoder = StreamingDecoder(buffer)
+
+    for i in range(0, len(data), 1000):
+        decoder.feed(data[i : i + 1000])
+    decoder.close()
+
+    assert decoder.error is None
+    assert abs(buffer.duration - 2.0) < 0.05
+    assert buffer.read(0).dtype == np.float32
+    assert buffer.sample_rate == SAMPLE_RATE
+
+
+def test_decoder_survives_garbage_input():
+    buffer = AudioStore(capacity_seconds=1)
+    decoder = StreamingDecoder(buffer)
+
+    decoder.feed(b"not a media container")
+    decoder.close()
+
+    assert decoder.error is not None
+    assert buffer.total_samples == 0
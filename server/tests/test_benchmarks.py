@@ -0,0 +1,33 @@
+import io
+
+import av
+import numpy as np
+
+from benchmarks.compare import compare
+from benchmarks.fixtures import encode, synthesize
+
+
+def test_fixtures_are_reproducible():
+    signal = synthesize(3.0, seed=1)
+
+    np.testing.assert_array_equal(signal, synthesize(3.0, seed=1))
+    assert (signal == 0).any() and np.abs(signal).max() > 0.1
+
+    with av.open(io.BytesIO(encode(signal)), mode="r") as container:
+        samples = sum(frame.samples for frame in container.decode(audio=0))
+    assert abs(samples / 48000 - 3.0) < 0.05
+
+
+def test_compare_reports_changed_results():
+    before = {
+        "environment": {"commit": "a"},
+        "runs": [{"sessions": 1, "real_time_factor": {"max": 1.0}}],
+    }
+    after = {
+        "environment": {"commit": "b"},
+        "runs": [{"sessions": 1, "real_time_factor": {"max": 1.5}}],
+    }
+
+    assert compare(before, after) == [
+        "runs.1.real_time_factor.max: 1.0 -> 1.5 (+50.0%)"
+    ]
@@ -0,0 +1,35 @@
+import numpy as np
+
+from lib.audio import SAMPLE_RATE
+from lib.config import ModelTierConfig, settings
+from lib.engines import FakeEngine
+from lib.model import load_engine, registry
+
+
+def test_fake_engine_is_deterministic():
+    engine = FakeEngine(
+        latency=0,
+        seconds_per_audio_second=0,
+        segment_seconds=1.0,
+        words=["a", "b"],
+        language="de",
+    )
+    windows = [np.zeros(int(2.5 * SAMPLE_RATE), dtype=np.float32)] * 2
+
+    detected, pinned = engine.transcribe_batch(windows, [None, "fr"])
+
+    assert [s.text for s in detected["segments"]] == [" a", " b"]
+    assert detected["segments"][1].end == 2.0
+    assert detected["language"] == "de"
+    assert detected["language_probability"] == 1.0
+    assert pinned == {"segments": detected["segments"], "language": "fr"}
+
+
+def test_engine_is_selected_from_settings(monkeypatch):
+    monkeypatch.setattr(settings, "TRANSCRIPTION_ENGINE", "fake")
+
+    engine = load_engine(ModelTierConfig(size="tiny", memory_mb=1))
+
+    assert isinstance(engine, FakeEngine)
+    assert engine.words == settings.FAKE_ENGINE_WORDS
+    assert registry.model_name("tiny") == "fake"
@@ -0,0 +1,51 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from lib.hashing import HasherBusy, PasswordHasher, get_password_hasher
+from main import app
+
+
+def test_hash_and_verify_in_worker_processes():
+    hasher = PasswordHasher(workers=1, max_queue=0, rounds=4)
+
+    async def run():
+        hashed = await hasher.hash("password")
+        return hashed, await hasher.verify("password", hashed)
+
+    try:
+        hashed, valid = asyncio.run(run())
+    finally:
+        hasher.close()
+    assert hashed.startswith("$2b$04$")
+    assert valid
+
+
+def test_rejects_when_queue_is_full():
+    hasher = PasswordHasher(workers=1, max_queue=1, rounds=4, use_processes=False)
+
+    async def run():
+        return await asyncio.gather(
+            *(hasher.hash("password") for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    hasher.close()
+    assert sum(isinstance(r, HasherBusy) for r in results) == 1
+    assert hasher.rejected == 1
+    assert hasher.pending == 0
+
+
+def test_login_returns_503_when_hasher_is_saturated(client: TestClient):
+    client.post("/auth/signup", json={"email": "busy@example.com", "password": "pw"})
+    hasher = PasswordHasher(workers=1, max_queue=0, rounds=4, use_processes=False)
+    hasher.pending = 1
+    app.dependency_overrides[get_password_hasher] = lambda: hasher
+    try:
+        response = client.post(
+            "/auth/login", json={"email": "busy@example.com", "password": "pw"}
+        )
+    finally:
+        del app.dependency_overrides[get_password_hasher]
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
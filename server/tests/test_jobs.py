@@ -0,0 +1,147 @@
+import asyncio
+import time
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from db.models import Session as SessionModel
+from db.models import TranscriptSegment
+from lib.audio import SAMPLE_RATE
+from lib.config import settings
+from lib.scheduler import InferenceScheduler
+from lib.streaming import Segment
+from main import app
+from routes.jobs import get_job_scheduler
+from tests.test_audio import encode_webm
+
+
+class StubExecutor:
+    # One " w<i>" segment per whole second of each window.
+    concurrency = 1
+
+    async def transcribe_batch(self, windows, languages):
+        return [
+            {
+                "segments": [
+                    Segment(float(i), float(i + 1), f" w{i}", confidence=1.0)
+                    for i in range(int(len(window) / SAMPLE_RATE))
+                ],
+                "language": language or "en",
+            }
+            for window, language in zip(windows, languages)
+        ]
+
+    async def close(self):
+        pass
+
+
+class BlockingExecutor:
+    concurrency = 1
+
+    async def transcribe_batch(self, windows, languages):
+        await asyncio.Event().wait()
+
+    async def close(self):
+        pass
+
+
+def use_scheduler(executor) -> None:
+    scheduler = InferenceScheduler(
+        executor, max_batch_size=4, max_wait=0.01, model_name="stub"
+    )
+    app.dependency_overrides[get_job_scheduler] = lambda: scheduler
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_CHUNK_MIN_SECONDS", 1.0)
+    monkeypatch.setattr(settings, "JOB_CHUNK_MAX_SECONDS", 2.0)
+    yield
+    app.dependency_overrides.pop(get_job_scheduler, None)
+
+
+def signup(client: TestClient, email: str = "jobs@example.com") -> dict:
+    response = client.post("/auth/signup", json={"email": email, "password": "pw"})
+    return {"Authorization": f"Bearer {response.json()['data']['access_token']}"}
+
+
+def wait_for(client: TestClient, job_id: str, headers: dict, status: str) -> dict:
+    deadline = time.monotonic() + 10
+    while True:
+        job = client.get(f"/jobs/{job_id}", headers=headers).json()["data"]
+        if job["status"] == status:
+            return job
+        assert job["status"] in ("queued", "running"), job
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+
+def test_job_transcribes_upload_into_session(client: TestClient, db_session):
+    use_scheduler(StubExecutor())
+    headers = signup(client)
+
+    response = client.post("/jobs/", content=encode_webm(5.0), headers=headers)
+    assert response.status_code == 202
+    job = wait_for(client, response.json()["data"]["id"], headers, "completed")
+
+    assert job["chunks_total"] >= 3
+    assert job["chunks_done"] == job["chunks_total"]
+    assert job["progress"] == 1.0
+    assert abs(job["duration_seconds"] - 5.0) < 0.1
+
+    session = db_session.get(SessionModel, uuid.UUID(job["session_id"]))
+    assert session.duration_seconds == 5
+    assert session.language == "en"
+    segments = (
+        db_session.query(TranscriptSegment)
+        .filter(TranscriptSegment.session_id == session.id)
+        .order_by(TranscriptSegment.position)
+        .all()
+    )
+    assert [s.start for s in segments] == sorted(s.start for s in segments)
+    assert " ".join(s.text for s in segments) == session.final_transcript
+    assert session.word_count == len(segments) > 0
+
+    other = signup(client, "other@example.com")
+    assert client.get(f"/jobs/{job['id']}", headers=other).status_code == 404
+
+
+def test_job_can_be_cancelled(client: TestClient):
+    use_scheduler(BlockingExecutor())
+    headers = signup(client)
+
+    response = client.post("/jobs/", content=encode_webm(3.0), headers=headers)
+    job_id = response.json()["data"]["id"]
+    wait_for(client, job_id, headers, "running")
+
+    response = client.delete(f"/jobs/{job_id}", headers=headers)
+    assert response.status_code == 200
+    job = wait_for(client, job_id, headers, "cancelled")
+    assert job["session_id"] is None
+
+
+def test_job_rejects_oversized_upload(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_MAX_UPLOAD_MB", 0)
+    headers = signup(client)
+
+    response = client.post("/jobs/", content=b"x" * 10, headers=headers)
+    assert response.status_code == 413
+
+
+def test_job_rejects_unsupported_language(client: TestClient):
+    headers = signup(client)
+
+    response = client.post(
+        "/jobs/", content=encode_webm(1.0), headers=headers, params={"language": "xx"}
+    )
+    assert response.status_code == 400
+
+
+def test_job_rejects_malformed_content_length(client: TestClient):
+    headers = signup(client)
+
+    response = client.post(
+        "/jobs/", content=b"x", headers={**headers, "Content-Length": "abc"}
+    )
+    assert response.status_code == 400
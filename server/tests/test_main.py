@@ -1,5 +1,8 @@
 from fastapi.testclient import TestClient
 
+from lib.config import settings
+from main import app
+
 
 def test_health_check(client: TestClient):
     response = client.get("/health")
@@ -14,3 +17,23 @@ def test_read_root(client: TestClient):
     response = client.get("/")
     assert response.status_code == 200
     assert response.json() == {"message": "Transcribe Server Running on port 8000"}
+
+
+def test_liveness(client: TestClient):
+    response = client.get("/health/live")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+
+def test_readiness(client: TestClient):
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+
+
+def test_readiness_fails_when_warmup_fails(monkeypatch):
+    monkeypatch.setattr(settings, "PRELOAD_MODEL_TIERS", ["missing"])
+    with TestClient(app) as c:
+        response = c.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "starting"
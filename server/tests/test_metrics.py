@@ -0,0 +1,37 @@
+from fastapi.testclient import TestClient
+
+from lib.metrics import Histogram, auth_seconds
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency_seconds", "Latency.", (0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(value)
+
+    assert histogram.render() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{le="0.1"} 2',
+        'latency_seconds_bucket{le="1.0"} 3',
+        'latency_seconds_bucket{le="+Inf"} 4',
+        "latency_seconds_sum 3.65",
+        "latency_seconds_count 4",
+    ]
+
+
+def test_metrics_endpoint(client: TestClient):
+    response = client.post(
+        "/auth/signup", json={"email": "metrics@example.com", "password": "pw"}
+    )
+    token = response.json()["data"]["access_token"]
+    before = sum(auth_seconds.counts)
+    client.get("/sessions/", headers={"Authorization": f"Bearer {token}"})
+    assert sum(auth_seconds.counts) == before + 1
+
+    response = client.get("/metrics")
+
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = response.text.splitlines()
+    assert f"auth_token_seconds_count {before + 1}" in lines
+    assert "# TYPE transcribe_active_sessions gauge" in lines
+    assert any(line.startswith("transcribe_audio_buffer_bytes ") for line in lines)
@@ -0,0 +1,84 @@
+import pytest
+
+from lib.config import ModelTierConfig
+from lib.model import ModelRegistry
+
+
+def make_registry(loads: list[str], **kwargs) -> ModelRegistry:
+    def loader(config: ModelTierConfig):
+        loads.append(config.size)
+        return config.size
+
+    return ModelRegistry(
+        {
+            "tiny": ModelTierConfig(size="tiny", memory_mb=100),
+            "base": ModelTierConfig(size="base", memory_mb=200),
+            "small": ModelTierConfig(size="small", memory_mb=400),
+        },
+        memory_budget_mb=500,
+        loader=loader,
+        **kwargs,
+    )
+
+
+def test_models_load_lazily_and_stay_warm():
+    loads = []
+    registry = make_registry(loads)
+    assert registry.loaded == []
+
+    first = registry.get("tiny")
+    second = registry.get("tiny")
+
+    assert first is second
+    assert loads == ["tiny"]
+    assert registry.model_name("tiny") == "faster-whisper-tiny"
+
+
+def test_least_recently_used_model_is_evicted_over_budget():
+    loads = []
+    registry = make_registry(loads)
+    registry.get("tiny")
+    registry.get("base")
+    registry.get("tiny")
+
+    registry.get("small")
+
+    assert sorted(registry.loaded) == ["small", "tiny"]
+    assert registry.memory_used_mb == 500
+
+
+def test_pooled_tiers_count_every_copy_and_are_unloaded():
+    unloaded = []
+    registry = make_registry([], copies=2, unload=unloaded.append)
+    registry.get("tiny")
+    registry.get("base")
+
+    assert registry.loaded == ["base"]
+    assert registry.memory_used_mb == 400
+    assert unloaded == ["tiny"]
+
+
+def test_leased_model_is_not_evicted():
+    unloaded = []
+    registry = make_registry([], unload=unloaded.append)
+    registry.acquire("tiny")
+    registry.get("base")
+
+    registry.get("small")
+
+    assert sorted(registry.loaded) == ["small", "tiny"]
+    assert unloaded == ["base"]
+
+    registry.release("tiny")
+    registry.get("base")
+
+    assert "tiny" not in registry.loaded
+    assert "tiny" in unloaded
+
+
+def test_unknown_tier():
+    registry = make_registry([])
+
+    assert "large" not in registry
+    with pytest.raises(KeyError):
+        registry.get("large")
@@ -0,0 +1,45 @@
+from lib.pacing import TickPacer
+
+
+def make_pacer() -> TickPacer:
+    return TickPacer(
+        interval=1.0, min_interval=0.5, max_interval=5.0, headroom=2.0, smoothing=1.0
+    )
+
+
+def test_interval_leaves_headroom_over_latency():
+    pacer = make_pacer()
+    pacer.record(latency=1.5, audio_seconds=1.0)
+
+    interval = pacer.next_interval(pressure=0.8)
+
+    assert pacer.interval == 3.0
+    assert 2.7 <= interval <= 3.3
+
+
+def test_interval_backs_off_under_pressure():
+    pacer = make_pacer()
+    pacer.record(latency=0.5, audio_seconds=1.0)
+
+    pacer.next_interval(pressure=2.0)
+
+    assert pacer.interval == 2.0
+
+
+def test_interval_tightens_when_idle():
+    pacer = make_pacer()
+    pacer.record(latency=0.1, audio_seconds=1.0)
+
+    pacer.next_interval(pressure=0.0)
+
+    assert pacer.interval == 0.5
+    assert pacer.real_time_factor == 0.1
+
+
+def test_interval_is_capped():
+    pacer = make_pacer()
+    pacer.record(latency=10.0, audio_seconds=1.0)
+
+    pacer.next_interval(pressure=3.0)
+
+    assert pacer.interval == 5.0
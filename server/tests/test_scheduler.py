@@ -0,0 +1,97 @@
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from lib.audio import SAMPLE_RATE
+from lib.inference import BatchTranscriber
+from lib.scheduler import InferenceScheduler
+
+
+class FakeModel:
+    def detect_language(self, audio):
+        return "en", 1.0, []
+
+
+class FakePipeline:
+    def transcribe(self, audio, clip_timestamps, **kwargs):
+        segments = [
+            SimpleNamespace(
+                start=clip["start"], end=clip["end"], text=f" clip{i}", avg_logprob=0.0
+            )
+            for i, clip in enumerate(clip_timestamps)
+        ]
+        return iter(segments), None
+
+
+class FakeExecutor:
+    def __init__(self, concurrency: int = 1):
+        self.concurrency = concurrency
+        self.batch_sizes = []
+
+    async def transcribe_batch(self, windows, languages):
+        self.batch_sizes.append(len(windows))
+        await asyncio.sleep(0.01)
+        return [{"segments": [], "language": str(len(w))} for w in windows]
+
+    async def close(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_batched():
+    executor = FakeExecutor()
+    scheduler = InferenceScheduler(executor, max_batch_size=3, max_wait=0.05)
+
+    windows = [np.zeros(n, dtype=np.float32) for n in range(1, 6)]
+    results = await asyncio.gather(*(scheduler.transcribe(w) for w in windows))
+    await scheduler.stop()
+
+    assert executor.batch_sizes == [3, 2]
+    assert [r["language"] for r in results] == ["1", "2", "3", "4", "5"]
+
+
+@pytest.mark.asyncio
+async def test_batches_queue_while_executor_is_busy():
+    executor = FakeExecutor()
+    scheduler = InferenceScheduler(executor, max_batch_size=8, max_wait=0)
+
+    first = asyncio.create_task(scheduler.transcribe(np.zeros(1, dtype=np.float32)))
+    await asyncio.sleep(0)
+    rest = [
+        asyncio.create_task(scheduler.transcribe(np.zeros(2, dtype=np.float32)))
+        for _ in range(4)
+    ]
+    await asyncio.gather(first, *rest)
+    await scheduler.stop()
+
+    assert executor.batch_sizes == [1, 4]
+
+
+@pytest.mark.asyncio
+async def test_empty_window_skips_inference():
+    scheduler = InferenceScheduler(FakeExecutor(), max_batch_size=3, max_wait=0.05)
+
+    result = await scheduler.transcribe(np.zeros(0, dtype=np.float32), "de")
+
+    assert result == {"segments": [], "language": "de"}
+    assert scheduler._task is None
+
+
+def test_batched_segments_are_routed_to_their_window():
+    transcriber = BatchTranscriber(FakeModel())
+    transcriber._pipeline = FakePipeline()
+    windows = [
+        np.zeros(SAMPLE_RATE * 2, dtype=np.float32),
+        np.zeros(SAMPLE_RATE * 3, dtype=np.float32),
+    ]
+
+    results = transcriber.transcribe_batch(windows, [None, "en"])
+
+    assert [[s.text for s in r["segments"]] for r in results] == [
+        [" clip0"],
+        [" clip1"],
+    ]
+    segment = results[1]["segments"][0]
+    assert (segment.start, segment.end) == (0.0, 3.0)
@@ -1,5 +1,5 @@
 import uuid
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
@@ -34,7 +34,89 @@ def test_get_sessions(client: TestClient, db_session: Session):
     assert response.status_code == 200
     data = response.json()["data"]
     assert len(data) == 1
-    assert data[0]["final_transcript"] == "Hello world"
+    assert data[0]["snippet"] == "Hello world"
+    assert "final_transcript" not in data[0]
+
+
+def test_get_sessions_keyset_pagination(client: TestClient, db_session: Session):
+    response = client.post(
+        "/auth/signup",
+        json={"email": "test@example.com", "password": "password"},
+    )
+    token = response.json()["data"]["access_token"]
+    user_id = uuid.UUID(response.json()["data"]["user"]["id"])
+
+    base = datetime(2025, 1, 1, tzinfo=UTC)
+    start_times = [base + timedelta(minutes=i) for i in range(4)] + [base]
+    for index, start_time in enumerate(start_times):
+        db_session.add(
+            SessionModel(
+                id=uuid.uuid4(),
+                user_id=user_id,
+                start_time=start_time,
+                end_time=start_time,
+                duration_seconds=60,
+                final_transcript=f"session {index}",
+                word_count=2,
+            )
+        )
+    db_session.commit()
+
+    headers = {"Authorization": f"Bearer {token}"}
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2} if cursor is None else {"limit": 2, "cursor": cursor}
+        body = client.get("/sessions/", headers=headers, params=params).json()
+        seen.extend(body["data"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == 5
+    assert len({s["id"] for s in seen}) == 5
+    keys = [(s["start_time"], s["id"]) for s in seen]
+    assert keys == sorted(keys, reverse=True)
+    assert seen[0]["snippet"] == "session 3"
+
+    response = client.get("/sessions/", headers=headers, params={"cursor": "bogus"})
+    assert response.status_code == 400
+
+
+def test_get_sessions_fields_projection(client: TestClient, db_session: Session):
+    response = client.post(
+        "/auth/signup",
+        json={"email": "test@example.com", "password": "password"},
+    )
+    token = response.json()["data"]["access_token"]
+    user_id = uuid.UUID(response.json()["data"]["user"]["id"])
+    db_session.add(
+        SessionModel(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            start_time=datetime.now(UTC),
+            end_time=datetime.now(UTC),
+            duration_seconds=60,
+            final_transcript="word " * 1000,
+            word_count=1000,
+        )
+    )
+    db_session.commit()
+
+    headers = {"Authorization": f"Bearer {token}"}
+    response = client.get(
+        "/sessions/", headers=headers, params={"fields": "snippet,word_count"}
+    )
+    assert response.status_code == 200
+    (item,) = response.json()["data"]
+    assert set(item) == {"snippet", "word_count"}
+    assert len(item["snippet"]) <= 160
+    assert item["snippet"].endswith("…")
+
+    response = client.get(
+        "/sessions/", headers=headers, params={"fields": "final_transcript"}
+    )
+    assert response.status_code == 400
 
 
 def test_get_sessions_unauthenticated(client: TestClient):
@@ -117,3 +199,67 @@ def test_delete_session(client: TestClient, db_session: Session):
 
     response = client.get(f"/sessions/{session_id}", headers=headers)
     assert response.status_code == 404
+
+
+def test_search_sessions(client: TestClient, db_session: Session):
+    response = client.post(
+        "/auth/signup",
+        json={"email": "test@example.com", "password": "password"},
+    )
+    token = response.json()["data"]["access_token"]
+    user_id = uuid.UUID(response.json()["data"]["user"]["id"])
+    other = client.post(
+        "/auth/signup",
+        json={"email": "other@example.com", "password": "password"},
+    )
+    other_id = uuid.UUID(other.json()["data"]["user"]["id"])
+
+    transcripts = [
+        (user_id, "we discussed the budget and the budget review"),
+        (user_id, "quarterly budget planning"),
+        (user_id, "lunch plans"),
+        (user_id, ""),
+        (other_id, "budget secrets"),
+    ]
+    sessions = []
+    for owner, transcript in transcripts:
+        session = SessionModel(
+            id=uuid.uuid4(),
+            user_id=owner,
+            start_time=datetime.now(UTC),
+            end_time=datetime.now(UTC),
+            duration_seconds=60,
+            final_transcript=transcript,
+            word_count=len(transcript.split()),
+        )
+        sessions.append(session)
+        db_session.add(session)
+    db_session.commit()
+    # Transcripts are filled in when a live session ends.
+    sessions[3].final_transcript = "budget overrun"
+    db_session.commit()
+
+    headers = {"Authorization": f"Bearer {token}"}
+    seen = []
+    cursor = None
+    while True:
+        params = {"q": "budget", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/sessions/search", headers=headers, params=params)
+        assert response.status_code == 200
+        seen.extend(response.json()["data"])
+        cursor = response.json()["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == 3
+    assert {s["id"] for s in seen} == {str(s.id) for s in sessions[:2] + sessions[3:4]}
+    assert [s["rank"] for s in seen] == sorted((s["rank"] for s in seen), reverse=True)
+    (first,) = [s for s in seen if s["id"] == str(sessions[0].id)]
+    assert first["highlight"].count("<mark>budget</mark>") == 2
+
+    response = client.get(
+        "/sessions/search", headers=headers, params={"q": 'lunch"*'}
+    )
+    assert [s["id"] for s in response.json()["data"]] == [str(sessions[2].id)]
@@ -0,0 +1,77 @@
+from lib.streaming import Segment, StreamingTranscript
+
+
+def make_transcript() -> StreamingTranscript:
+    return StreamingTranscript(overlap=1.0, commit_margin=1.0, max_window=10.0)
+
+
+def test_segments_commit_after_two_agreeing_passes():
+    transcript = make_transcript()
+    segments = [Segment(0.0, 2.0, " Hello"), Segment(2.0, 4.5, " world")]
+
+    assert transcript.update(segments, 0.0, 5.0) == []
+    assert transcript.text == "Hello world"
+
+    committed = transcript.update(segments, 0.0, 6.0)
+    assert [s.text for s in committed] == [" Hello", " world"]
+    assert transcript.committed_until == 4.5
+    assert transcript.window_start == 3.5
+
+
+def test_unstable_tail_is_not_committed():
+    transcript = make_transcript()
+    segments = [Segment(0.0, 2.0, " Hello"), Segment(2.0, 4.5, " wor")]
+
+    transcript.update(segments, 0.0, 5.0)
+    transcript.update(segments, 0.0, 5.0)
+
+    assert transcript.committed_text == "Hello"
+    assert [s.text for s in transcript.tentative] == [" wor"]
+
+
+def test_overlap_segments_are_not_duplicated():
+    transcript = make_transcript()
+    first = [Segment(0.0, 2.0, " Hello")]
+    transcript.update(first, 0.0, 4.0)
+    transcript.update(first, 0.0, 4.0)
+
+    window_start = transcript.window_start
+    second = [Segment(0.0, 1.0, " Hello"), Segment(1.0, 3.0, " again")]
+    transcript.finalize(second, window_start)
+
+    assert transcript.committed_text == "Hello again"
+
+
+def test_long_window_is_force_committed():
+    transcript = make_transcript()
+    segments = [Segment(0.0, 5.0, " one"), Segment(5.0, 11.0, " two")]
+
+    committed = transcript.update(segments, 0.0, 12.0)
+
+    assert [s.text for s in committed] == [" one", " two"]
+
+
+def test_segment_reaching_into_the_tail_is_force_committed():
+    transcript = make_transcript()
+
+    committed = transcript.update([Segment(0.0, 11.5, " one")], 0.0, 12.0)
+
+    assert [s.text for s in committed] == [" one"]
+    assert transcript.window_start == 10.5
+
+
+def test_window_stays_bounded_when_little_is_decoded():
+    transcript = make_transcript()
+
+    transcript.update([Segment(0.0, 1.0, " one")], 0.0, 12.0)
+
+    assert transcript.committed_until == 11.0
+
+
+def test_silence_advances_window():
+    transcript = make_transcript()
+
+    transcript.update([], 0.0, 12.0)
+
+    assert transcript.committed_until == 11.0
+    assert transcript.committed == []
@@ -0,0 +1,31 @@
+from lib.tracing import NULL_TRACE, Tracer
+
+
+def test_tracer_keeps_most_recent_traces():
+    tracer = Tracer(capacity=2, sample_rate=0.0, max_events=2)
+
+    assert tracer.start("unsampled") is NULL_TRACE
+    first = tracer.start("a", forced=True)
+    tracer.start("b", forced=True)
+    tracer.start("c", forced=True)
+
+    assert tracer.get("a") is None
+    assert [t["session_id"] for t in tracer.summaries()] == ["c", "b"]
+
+    for _ in range(3):
+        with first.span("tick"):
+            pass
+    assert len(first.events) == 2
+    assert first.to_chrome()["otherData"]["dropped_events"] == 1
+
+
+def test_sampled_tracing():
+    tracer = Tracer(capacity=10, sample_rate=1.0, max_events=10)
+
+    trace = tracer.start("a")
+    with trace.span("inference", window_seconds=2.0) as span:
+        span["segments"] = 3
+
+    (event,) = trace.events
+    assert event["ph"] == "X"
+    assert event["args"] == {"window_seconds": 2.0, "segments": 3}
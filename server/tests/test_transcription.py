@@ -0,0 +1,496 @@
+import json
+import time
+import uuid
+from types import SimpleNamespace
+
+import msgpack
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from db.models import Session as SessionModel
+from db.models import TranscriptSegment
+from lib.audio import SAMPLE_RATE, audio_memory
+from lib.config import settings
+from lib.admission import USER_FULL, session_admission
+from lib.inference import BatchTranscriber, ThreadExecutor
+from lib.protocol import MSGPACK_V1, JsonProtocol
+from lib.resume import parked_sessions
+from lib.scheduler import InferenceScheduler, get_session_scheduler
+from lib.transcription import TranscriptionService
+from main import app
+from tests.test_audio import encode_webm
+
+
+class StubModel:
+    # One " w<i>" segment per second of audio, identical on every pass.
+    def transcribe(self, audio, language=None, **kwargs):
+        segments = [
+            SimpleNamespace(
+                start=float(i), end=float(i + 1), text=f" w{i}", avg_logprob=0.0
+            )
+            for i in range(int(len(audio) / SAMPLE_RATE))
+        ]
+        return iter(segments), None
+
+    def detect_language(self, audio=None, **kwargs):
+        return "en", 0.9, []
+
+
+@pytest.fixture()
+def scheduler():
+    scheduler = InferenceScheduler(
+        ThreadExecutor(lambda: BatchTranscriber(StubModel())),
+        max_batch_size=4,
+        max_wait=0.01,
+        model_name="stub",
+    )
+    app.dependency_overrides[get_session_scheduler] = lambda: scheduler
+    yield scheduler
+    del app.dependency_overrides[get_session_scheduler]
+
+
+def signup(client: TestClient) -> str:
+    response = client.post(
+        "/auth/signup", json={"email": "ws@example.com", "password": "password"}
+    )
+    return response.json()["data"]["access_token"]
+
+
+def receive_final(ws) -> dict:
+    while True:
+        message = ws.receive_json()
+        if message["type"] == "final":
+            return message
+
+
+def test_committed_segments_are_written_while_live(
+    client: TestClient, db_session, scheduler, monkeypatch
+):
+    monkeypatch.setattr(settings, "SEGMENT_FLUSH_SIZE", 1)
+    token = signup(client)
+
+    with client.websocket_connect(f"/ws/transcribe?token={token}") as ws:
+        data = encode_webm(6.0)
+        chunk = len(data) // 12
+        deadline = time.monotonic() + 10
+        for i in range(0, len(data), chunk):
+            ws.send_bytes(data[i : i + chunk])
+            time.sleep(0.25)
+        while not db_session.query(TranscriptSegment).count():
+            assert time.monotonic() < deadline
+            time.sleep(0.1)
+        ws.send_text(json.dumps({"type": "stop"}))
+        final = receive_final(ws)
+
+    session_id = uuid.UUID(final["session_id"])
+    segments = (
+        db_session.query(TranscriptSegment)
+        .filter(TranscriptSegment.session_id == session_id)
+        .order_by(TranscriptSegment.position)
+        .all()
+    )
+    assert [s.text for s in segments] == final["transcription"].split()
+    assert [s.position for s in segments] == list(range(len(segments)))
+    assert segments[0].confidence == 1.0
+
+    headers = {"Authorization": f"Bearer {token}"}
+    response = client.get(f"/sessions/{session_id}/segments", headers=headers)
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["text"] for line in lines] == [s.text for s in segments]
+
+    response = client.get(
+        f"/sessions/{session_id}/segments", headers=headers, params={"after": 0}
+    )
+    assert len(response.text.splitlines()) == len(segments) - 1
+
+
+def test_segments_committed_at_a_pause_are_written_during_the_silence(
+    client: TestClient, db_session, scheduler, monkeypatch
+):
+    monkeypatch.setattr(settings, "SEGMENT_FLUSH_SIZE", 100)
+    monkeypatch.setattr(settings, "SEGMENT_FLUSH_INTERVAL_SECONDS", 2.0)
+    token = signup(client)
+
+    with client.websocket_connect(f"/ws/transcribe?token={token}") as ws:
+        ws.receive_json()
+        ws.send_bytes(encode_webm(3.0, silence=6.0))
+        deadline = time.monotonic() + 10
+        while not db_session.query(TranscriptSegment).count():
+            assert time.monotonic() < deadline
+            time.sleep(0.1)
+        ws.send_text(json.dumps({"type": "stop"}))
+        receive_final(ws)
+
+
+def test_failed_segment_flush_is_retried(
+    client: TestClient, db_session, scheduler, monkeypatch
+):
+    monkeypatch.setattr(settings, "SEGMENT_FLUSH_SIZE", 1)
+    segment_rows = TranscriptionService._segment_rows
+    failures = []
+
+    def fail_once(self, segments):
+        rows = segment_rows(self, segments)
+        if rows and not failures:
+            # A duplicate primary key makes the first write fail and roll back.
+            failures.append(rows[0])
+            rows += segment_rows(self, segments[:1])
+        return rows
+
+    monkeypatch.setattr(TranscriptionService, "_segment_rows", fail_once)
+    token = signup(client)
+
+    with client.websocket_connect(f"/ws/transcribe?token={token}") as ws:
+        data = encode_webm(6.0)
+        chunk = len(data) // 12
+        deadline = time.monotonic() + 10
+        for i in range(0, len(data), chunk):
+            ws.send_bytes(data[i : i + chunk])
+            time.sleep(0.25)
+        # Written by a live flush after the failed one.
+        while not db_session.query(TranscriptSegment).count():
+            assert time.monotonic() < deadline
+            time.sleep(0.1)
+        ws.send_text(json.dumps({"type": "stop"}))
+        final = receive_final(ws)
+
+    assert failures
+    segments = (
+        db_session.query(TranscriptSegment)
+        .filter(TranscriptSegment.session_id == uuid.UUID(final["session_id"]))
+        .order_by(TranscriptSegment.position)
+        .all()
+    )
+    assert [s.text for s in segments] == final["transcription"].split()
+    assert [s.position for s in segments] == list(range(len(segments)))
+
+
+def test_msgpack_protocol_sends_segment_deltas(client: TestClient, scheduler):
+    token = signup(client)
+
+    with client.websocket_connect(
+        f"/ws/transcribe?token={token}", subprotocols=[MSGPACK_V1]
+    ) as ws:
+        assert ws.accepted_subprotocol == MSGPACK_V1
+        data = encode_webm(6.0)
+        chunk = len(data) // 12
+        for i in range(0, len(data), chunk):
+            ws.send_bytes(data[i : i + chunk])
+            time.sleep(0.25)
+        ws.send_text(json.dumps({"type": "stop"}))
+
+        messages = []
+        while not messages or messages[-1]["type"] != "final":
+            messages.append(msgpack.unpackb(ws.receive_bytes()))
+
+    assert [m["seq"] for m in messages] == list(range(1, len(messages) + 1))
+    assert messages[0]["type"] == "session"
+    deltas = [m for m in messages if m["type"] == "delta"]
+    assert deltas
+
+    committed, tentative = [], []
+    for delta in deltas:
+        committed += delta["committed"]
+        tentative = delta["tentative"]
+    assert committed + tentative
+    assert messages[-1]["transcription"].startswith(" ".join(s[2] for s in committed))
+
+
+def stream_and_stop(client: TestClient, url: str) -> dict:
+    with client.websocket_connect(url) as ws:
+        stream(ws, encode_webm(4.0))
+        ws.send_text(json.dumps({"type": "stop"}))
+        return receive_final(ws)
+
+
+def test_detected_language_is_pinned(client: TestClient, scheduler, monkeypatch):
+    calls = {"detect": 0, "transcribe": []}
+
+    def detect_language(self, audio=None, **kwargs):
+        calls["detect"] += 1
+        return "fr", 0.9, []
+
+    transcribe = StubModel.transcribe
+
+    def record(self, audio, language=None, **kwargs):
+        calls["transcribe"].append(language)
+        return transcribe(self, audio, language)
+
+    monkeypatch.setattr(StubModel, "detect_language", detect_language)
+    monkeypatch.setattr(StubModel, "transcribe", record)
+    monkeypatch.setattr(settings, "LANGUAGE_DETECT_MIN_SECONDS", 0.0)
+    token = signup(client)
+
+    final = stream_and_stop(client, f"/ws/transcribe?token={token}")
+
+    assert calls["detect"] == 1
+    assert len(calls["transcribe"]) > 1
+    assert set(calls["transcribe"]) == {"fr"}
+    assert final["language"] == "fr"
+    assert final["language_probability"] == 0.9
+    assert final["detection_seconds_saved"] >= 0
+
+
+def test_client_language_skips_detection(client: TestClient, scheduler, monkeypatch):
+    def detect_language(self, audio=None, **kwargs):
+        raise AssertionError("language was supplied")
+
+    monkeypatch.setattr(StubModel, "detect_language", detect_language)
+    token = signup(client)
+
+    final = stream_and_stop(client, f"/ws/transcribe?token={token}&language=de")
+
+    assert final["language"] == "de"
+    assert final["language_probability"] is None
+    assert final["transcription"]
+
+    with pytest.raises(WebSocketDisconnect) as exc:
+        with client.websocket_connect(f"/ws/transcribe?token={token}&language=xx"):
+            pass
+    assert exc.value.code == 1008
+
+
+def test_traced_session_exports_chrome_trace(
+    client: TestClient, scheduler, monkeypatch
+):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+    token = signup(client)
+
+    final = stream_and_stop(client, f"/ws/transcribe?token={token}&trace=true")
+
+    admin = {"X-Admin-Token": "secret"}
+    response = client.get(f"/admin/traces/{final['session_id']}", headers=admin)
+    assert response.status_code == 200
+    trace = response.json()
+    assert trace["otherData"]["session_id"] == final["session_id"]
+    spans = {e["name"] for e in trace["traceEvents"] if e["ph"] == "X"}
+    assert {"receive", "tick", "inference", "send", "finalize", "save"} <= spans
+
+    untraced = stream_and_stop(client, f"/ws/transcribe?token={token}")
+    response = client.get(f"/admin/traces/{untraced['session_id']}", headers=admin)
+    assert response.status_code == 404
+
+
+def test_sessions_over_user_quota_are_refused(
+    client: TestClient, scheduler, monkeypatch
+):
+    monkeypatch.setattr(session_admission, "max_sessions_per_user", 1)
+    token = signup(client)
+
+    with client.websocket_connect(f"/ws/transcribe?token={token}") as first:
+        assert first.receive_json()["type"] == "session"
+        with client.websocket_connect(f"/ws/transcribe?token={token}") as second:
+            refused = second.receive_json()
+            assert refused == {
+                "type": "unavailable",
+                "reason": USER_FULL,
+                "retry_after": session_admission.retry_after,
+            }
+            with pytest.raises(WebSocketDisconnect) as exc:
+                second.receive_json()
+            assert exc.value.code == 1013
+        first.send_text(json.dumps({"type": "stop"}))
+        receive_final(first)
+
+    assert session_admission.active == 0
+
+
+def test_refused_sessions_release_audio_memory(
+    client: TestClient, scheduler, monkeypatch
+):
+    monkeypatch.setattr(session_admission, "max_sessions_per_user", 0)
+    token = signup(client)
+    used = audio_memory.used_bytes
+
+    for _ in range(3):
+        with pytest.raises(WebSocketDisconnect) as exc:
+            with client.websocket_connect(f"/ws/transcribe?token={token}") as ws:
+                ws.receive_json()
+                ws.receive_json()
+        assert exc.value.code == 1013
+
+    assert audio_memory.used_bytes == used
+
+
+def test_sessions_wait_in_line_when_worker_is_full(
+    client: TestClient, scheduler, monkeypatch
+):
+    monkeypatch.setattr(session_admission, "max_sessions", 1)
+    monkeypatch.setattr(session_admission, "wait_queue_size", 1)
+    monkeypatch.setattr(session_admission, "poll_interval", 0.05)
+    token = signup(client)
+
+    with client.websocket_connect(f"/ws/transcribe?token={token}") as first:
+        assert first.receive_json()["type"] == "session"
+        with client.websocket_connect(f"/ws/transcribe?token={token}") as second:
+            assert second.receive_json() == {"type": "queued", "position": 1}
+            first.send_text(json.dumps({"type": "stop"}))
+            receive_final(first)
+            assert second.receive_json()["type"] == "session"
+            second.send_text(json.dumps({"type": "stop"}))
+            receive_final(second)
+
+    assert session_admission.active == 0
+
+
+def test_undecodable_audio_is_reported(client: TestClient, scheduler):
+    token = signup(client)
+
+    with client.websocket_connect(f"/ws/transcribe?token={token}") as ws:
+        ws.send_bytes(b"not a webm stream" * 64)
+        ws.send_text(json.dumps({"type": "stop"}))
+        final = receive_final(ws)
+
+    assert final["error"] == "Could not decode audio"
+    assert final["transcription"] == ""
+
+
+def test_session_is_finalized_when_a_partial_cannot_be_sent(
+    client: TestClient, scheduler, monkeypatch
+):
+    send = JsonProtocol.send
+
+    async def drop_partials(self, message):
+        if message["type"] == "partial":
+            raise RuntimeError("socket dropped")
+        await send(self, message)
+
+    monkeypatch.setattr(JsonProtocol, "send", drop_partials)
+    token = signup(client)
+    used = audio_memory.used_bytes
+
+    final = stream_and_stop(client, f"/ws/transcribe?token={token}")
+
+    assert final["transcription"]
+    assert audio_memory.used_bytes == used
+
+
+def test_resume_that_fails_while_queued_is_parked_again(
+    client: TestClient, db_session, scheduler, monkeypatch
+):
+    monkeypatch.setattr(parked_sessions, "grace_seconds", 1.0)
+    token = signup(client)
+
+    with client.websocket_connect(f"/ws/transcribe?token={token}") as ws:
+        started = ws.receive_json()
+        stream(ws, encode_webm(3.0))
+
+    async def gone(self, position):
+        raise RuntimeError("socket dropped")
+
+    monkeypatch.setattr(TranscriptionService, "_send_queued", gone)
+    monkeypatch.setattr(session_admission, "max_sessions", 0)
+    monkeypatch.setattr(session_admission, "wait_queue_size", 1)
+    with client.websocket_connect(
+        f"/ws/transcribe?token={token}&resume={started['resume_token']}"
+    ):
+        pass
+    assert len(parked_sessions) == 1
+
+    deadline = time.monotonic() + 10
+    session_id = uuid.UUID(started["session_id"])
+    while not db_session.get(SessionModel, session_id).final_transcript:
+        assert time.monotonic() < deadline
+        time.sleep(0.1)
+        db_session.expire_all()
+
+
+def test_segments_of_unknown_session(client: TestClient):
+    token = signup(client)
+    response = client.get(
+        f"/sessions/{uuid.uuid4()}/segments",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 404
+
+
+def stream(ws, data: bytes, chunks: int = 6) -> None:
+    chunk = len(data) // chunks
+    for i in range(0, len(data), chunk):
+        ws.send_bytes(data[i : i + chunk])
+        time.sleep(0.25)
+
+
+def test_session_resumes_after_disconnect(client: TestClient, db_session, scheduler):
+    token = signup(client)
+    data = encode_webm(6.0)
+    half = len(data) // 2
+
+    with client.websocket_connect(f"/ws/transcribe?token={token}") as ws:
+        started = ws.receive_json()
+        assert started["type"] == "session"
+        stream(ws, data[:half])
+    assert len(parked_sessions) == 1
+
+    with client.websocket_connect(
+        f"/ws/transcribe?token={token}&resume={started['resume_token']}"
+    ) as ws:
+        resumed = ws.receive_json()
+        assert resumed["type"] == "resumed"
+        assert resumed["session_id"] == started["session_id"]
+        stream(ws, data[half:])
+        ws.send_text(json.dumps({"type": "stop"}))
+        final = receive_final(ws)
+
+    assert len(parked_sessions) == 0
+    assert final["session_id"] == started["session_id"]
+    assert resumed["text"]
+    assert len(final["transcription"].split()) > len(resumed["text"].split())
+    assert db_session.query(SessionModel).count() == 1
+
+
+def test_parked_session_is_finalized_after_grace(
+    client: TestClient, db_session, scheduler, monkeypatch
+):
+    monkeypatch.setattr(parked_sessions, "grace_seconds", 0.2)
+    token = signup(client)
+
+    with client.websocket_connect(f"/ws/transcribe?token={token}") as ws:
+        started = ws.receive_json()
+        stream(ws, encode_webm(3.0))
+
+    deadline = time.monotonic() + 10
+    session_id = uuid.UUID(started["session_id"])
+    while not db_session.get(SessionModel, session_id).final_transcript:
+        assert time.monotonic() < deadline
+        time.sleep(0.1)
+        db_session.expire_all()
+    assert len(parked_sessions) == 0
+
+    with pytest.raises(WebSocketDisconnect) as exc:
+        with client.websocket_connect(
+            f"/ws/transcribe?token={token}&resume={started['resume_token']}"
+        ) as ws:
+            ws.receive_json()
+    assert exc.value.code == 1008
+
+
+def test_refused_resume_keeps_the_grace_deadline(
+    client: TestClient, db_session, scheduler, monkeypatch
+):
+    monkeypatch.setattr(parked_sessions, "grace_seconds", 1.0)
+    token = signup(client)
+
+    with client.websocket_connect(f"/ws/transcribe?token={token}") as ws:
+        started = ws.receive_json()
+        stream(ws, encode_webm(3.0))
+    parked_at = time.monotonic()
+
+    monkeypatch.setattr(session_admission, "max_sessions_per_user", 0)
+    session_id = uuid.UUID(started["session_id"])
+    while not db_session.get(SessionModel, session_id).final_transcript:
+        # Retrying against a full worker must not keep the session parked.
+        assert time.monotonic() - parked_at < 5
+        try:
+            with client.websocket_connect(
+                f"/ws/transcribe?token={token}&resume={started['resume_token']}"
+            ) as ws:
+                assert ws.receive_json()["type"] == "unavailable"
+        except WebSocketDisconnect as exc:
+            # Expired between the check and the reconnect.
+            assert exc.code == 1008
+        time.sleep(0.2)
+        db_session.expire_all()
+    assert len(parked_sessions) == 0
@@ -0,0 +1,103 @@
+import time
+import uuid
+
+from fastapi.testclient import TestClient
+
+from db.models import User
+from lib.config import settings
+from lib.user_cache import UserCache, user_cache
+
+
+def make_user() -> User:
+    return User(id=uuid.uuid4(), email="a@example.com", password_hash="x")
+
+
+def test_get_returns_snapshot_and_counts():
+    cache = UserCache(max_size=10, ttl=60)
+    user = make_user()
+    assert cache.get("token") is None
+    cache.set("token", user)
+    cached = cache.get("token")
+    assert cached is not user
+    assert cached.id == user.id
+    assert cache.stats() == {"size": 1, "max_size": 10, "hits": 1, "misses": 1}
+
+
+def test_entries_expire_with_ttl_or_token():
+    cache = UserCache(max_size=10, ttl=60)
+    cache.set("ttl", make_user())
+    cache.set("token", make_user(), expires_at=time.time() - 1)
+    cache.ttl = 0
+    cache.set("zero", make_user())
+    assert cache.get("ttl") is not None
+    assert cache.get("token") is None
+    assert cache.get("zero") is None
+
+
+def test_evicts_least_recently_used():
+    cache = UserCache(max_size=2, ttl=60)
+    cache.set("a", make_user())
+    cache.set("b", make_user())
+    cache.get("a")
+    cache.set("c", make_user())
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_invalidate_user_drops_all_tokens():
+    cache = UserCache(max_size=10, ttl=60)
+    user = make_user()
+    cache.set("a", user)
+    cache.set("b", user)
+    cache.set("c", make_user())
+    cache.invalidate_user(user.id)
+    assert cache.stats()["size"] == 1
+
+
+def test_authenticated_requests_hit_cache(client: TestClient):
+    response = client.post(
+        "/auth/signup", json={"email": "cache@example.com", "password": "password"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['data']['access_token']}"}
+
+    assert client.get("/auth/me", headers=headers).status_code == 200
+    assert client.get("/auth/me", headers=headers).status_code == 200
+    assert user_cache.hits == 1
+    assert user_cache.misses == 1
+
+
+def test_password_change_invalidates_cache(client: TestClient, db_session):
+    response = client.post(
+        "/auth/signup", json={"email": "rotate@example.com", "password": "password"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['data']['access_token']}"}
+    client.get("/auth/me", headers=headers)
+    assert user_cache.stats()["size"] == 1
+
+    user = db_session.query(User).filter(User.email == "rotate@example.com").one()
+    user.email = "renamed@example.com"
+    db_session.commit()
+    assert user_cache.stats()["size"] == 1
+
+    user.password_hash = "changed"
+    db_session.commit()
+    assert user_cache.stats()["size"] == 0
+
+    client.get("/auth/me", headers=headers)
+    db_session.delete(user)
+    db_session.commit()
+    assert user_cache.stats()["size"] == 0
+    assert client.get("/auth/me", headers=headers).status_code == 401
+
+
+def test_admin_stats_requires_token(client: TestClient, monkeypatch):
+    assert client.get("/admin/stats").status_code == 403
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+    assert (
+        client.get("/admin/stats", headers={"X-Admin-Token": "wrong"}).status_code
+        == 403
+    )
+    response = client.get("/admin/stats", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    assert response.json()["user_cache"]["max_size"] == settings.USER_CACHE_SIZE
@@ -0,0 +1,98 @@
+import numpy as np
+
+from lib.audio import AudioStore
+from lib.streaming import Segment, StreamingTranscript
+from lib.vad import VoiceActivityDetector, split_at_silence
+
+SAMPLE_RATE = 1000
+
+
+def make_vad() -> VoiceActivityDetector:
+    return VoiceActivityDetector(
+        threshold=0.1,
+        frame_ms=100,
+        min_silence_ms=300,
+        speech_pad_ms=100,
+        sample_rate=SAMPLE_RATE,
+    )
+
+
+def tone(seconds: float) -> np.ndarray:
+    return np.full(int(seconds * SAMPLE_RATE), 0.5, dtype=np.float32)
+
+
+def silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+def test_silence_is_not_speech():
+    vad = make_vad()
+
+    assert not vad.process(silence(1.0), 0.0)
+    assert vad.position == 1.0
+    assert vad.endpoint() is None
+
+
+def test_pause_after_speech_is_an_endpoint():
+    vad = make_vad()
+
+    assert vad.process(tone(1.0), 0.0)
+    assert vad.endpoint() is None
+
+    assert not vad.process(silence(0.2), 1.0)
+    assert vad.endpoint() is None
+
+    vad.process(silence(0.2), 1.2)
+    assert vad.last_speech_end == 1.0
+    assert vad.endpoint() == 1.1
+
+
+def test_partial_frames_are_left_for_the_next_call():
+    vad = make_vad()
+
+    vad.process(silence(0.25), 0.0)
+
+    assert vad.position == 0.2
+
+
+def test_endpoint_commits_speech_and_drops_silence():
+    transcript = StreamingTranscript(overlap=1.0, commit_margin=1.0, max_window=10.0)
+    segments = [Segment(0.0, 1.5, " Hello"), Segment(2.5, 3.0, " uh")]
+
+    committed = transcript.update(segments, 0.0, 3.0, endpoint=1.7)
+
+    assert [s.text for s in committed] == [" Hello"]
+    assert transcript.tentative == []
+    assert transcript.committed_until == 1.7
+
+
+def test_advance_waits_for_tentative_segments():
+    transcript = StreamingTranscript(overlap=1.0, commit_margin=1.0, max_window=10.0)
+    transcript.update([Segment(0.0, 1.0, " Hi")], 0.0, 1.5)
+
+    transcript.advance(5.0)
+    assert transcript.committed_until == 0.0
+
+    transcript.update([Segment(0.0, 1.0, " Hi")], 0.0, 2.0, endpoint=1.2)
+    transcript.advance(5.0)
+    assert transcript.committed_until == 5.0
+
+
+def test_split_at_silence_cuts_inside_pauses():
+    silence = np.zeros(int(0.5 * SAMPLE_RATE), dtype=np.float32)
+    store = AudioStore(capacity_seconds=60, sample_rate=SAMPLE_RATE)
+    # Speech with pauses at 3.0-3.5s, 6.5-7.0s and 10.0-10.5s.
+    for seconds in (3.0, 3.0, 3.0, 3.0):
+        store.append(tone(seconds))
+        store.append(silence)
+
+    chunks = split_at_silence(
+        store, min_seconds=2.0, max_seconds=4.0, frame_ms=100, pause_ms=300
+    )
+
+    assert chunks[0][0] == 0.0
+    assert chunks[-1][1] == store.duration
+    assert all(end - start <= 4.0 for start, end in chunks)
+    for (_, cut), (start, _) in zip(chunks, chunks[1:]):
+        assert cut == start
+        assert any(pause <= cut <= pause + 0.5 for pause in (3.0, 6.5, 10.0))
@@ -0,0 +1,72 @@
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from lib.inference import BatchTranscriber
+from lib.workers import InferenceWorkerPool, WorkerError
+
+
+class FakeModel:
+    def detect_language(self, audio):
+        return "en", 1.0, []
+
+    def transcribe(self, audio, language=None):
+        if len(audio) == 13:
+            os._exit(1)
+        segment = SimpleNamespace(
+            start=0.0, end=1.0, text=f" {audio.sum():g}", avg_logprob=0.0
+        )
+        return iter([segment]), None
+
+
+def load_fake_engine():
+    return BatchTranscriber(FakeModel())
+
+
+@pytest.fixture()
+def pool():
+    pool = InferenceWorkerPool(
+        size=1,
+        loader=load_fake_engine,
+        capacity_seconds=1,
+        timeout=10,
+        health_interval=60,
+    )
+    pool.start()
+    yield pool
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_pool_transcribes_through_shared_memory(pool: InferenceWorkerPool):
+    windows = [np.full(4, 2, dtype=np.float32)]
+
+    results = await pool.transcribe_batch(windows, [None])
+
+    assert results[0]["language"] == "en"
+    assert results[0]["segments"][0].text == " 8"
+
+
+@pytest.mark.asyncio
+async def test_crashed_worker_is_restarted(pool: InferenceWorkerPool):
+    with pytest.raises(WorkerError):
+        await pool.transcribe_batch([np.zeros(13, dtype=np.float32)], ["en"])
+
+    assert pool.restarts == 1
+    assert pool.alive_workers == 1
+
+    results = await pool.transcribe_batch([np.ones(3, dtype=np.float32)], ["en"])
+    assert results[0]["segments"][0].text == " 3"
+
+
+def test_health_check_replaces_dead_worker(pool: InferenceWorkerPool):
+    worker = pool._idle.queue[0]
+    worker.process.kill()
+    worker.process.join()
+
+    pool.check_health()
+
+    assert pool.restarts == 1
+    assert pool.alive_workers == 1
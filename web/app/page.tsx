@@ -14,6 +14,7 @@ export default function HomePage() {
 	const [displayText, setDisplayText] = useState("");
 	const [error, setError] = useState("");
 	const [isFinalizing, setIsFinalizing] = useState(false);
+	const [queuePosition, setQueuePosition] = useState<number | null>(null);
 
 	const wsRef = useRef<TranscriptionWebSocket | null>(null);
 	const mediaRecorderRef = useRef<MediaRecorder | null>(null);
@@ -57,6 +58,12 @@ export default function HomePage() {
 				setDisplayText((prev) => prev + partialText);
 			});
 
+			ws.setOnResumed((text: string) => {
+				setDisplayText(text);
+			});
+
+			ws.setOnQueued(setQueuePosition);
+
 			ws.setOnFinal(handleFinalPayload);
 
 			ws.setOnError((error: string) => {
@@ -65,13 +72,18 @@ export default function HomePage() {
 			});
 
 			// connecting to the ws and starting the user media recording
-			await ws.connect();
+			try {
+				await ws.connect();
+			} catch (err) {
+				stream.getTracks().forEach((track) => track.stop());
+				throw err;
+			} finally {
+				setQueuePosition(null);
+			}
 			mediaRecorder.start(100);
 
 			mediaRecorder.ondataavailable = (event) => {
-				if (ws.isConnected()) {
-					ws.sendAudio(event.data);
-				}
+				ws.sendAudio(event.data);
 			};
 
 			mediaRecorder.onstop = () => {
@@ -151,6 +163,8 @@ export default function HomePage() {
 						<FinalizingLoader />
 					) : isRecording ? (
 						<p>Listening...</p>
+					) : queuePosition !== null ? (
+						<p>Server is busy, waiting in line (#{queuePosition})...</p>
 					) : (
 						<p>Ready to start</p>
 					)}
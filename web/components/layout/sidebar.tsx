@@ -66,7 +66,7 @@ export function Sidebar() {
 								const isActive =
 									pathname === `/session/${session.id}`;
 								const date = new Date(
-									session.start_time,
+									session.start_time ?? "",
 								).toLocaleDateString();
 
 								return (
@@ -83,7 +83,7 @@ export function Sidebar() {
 										{isOpen ? (
 											<div className="truncate">
 												<p className="font-medium truncate">
-													{session.final_transcript.substring(
+													{(session.snippet ?? "").substring(
 														0,
 														30,
 													)}
@@ -3,7 +3,9 @@ import { BaseResponse, SessionResponse, SingleSessionResponse } from "./types";
 
 class SessionsApi {
 	static async getSessions(): Promise<SessionResponse> {
-		const res = await api.get("/sessions");
+		const res = await api.get("/sessions", {
+			params: { fields: "id,start_time,snippet" },
+		});
 		return res.data;
 	}
 
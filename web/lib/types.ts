@@ -20,6 +20,10 @@ export interface Session {
 	updated_at: string;
 }
 
+export type SessionSummary = Partial<Omit<Session, "final_transcript">> & {
+	snippet?: string;
+};
+
 export interface BaseResponse {
 	message: string;
 }
@@ -42,7 +46,8 @@ export interface LoginResponse extends BaseResponse {
 }
 
 export interface SessionResponse extends BaseResponse {
-	data: Session[];
+	data: SessionSummary[];
+	next_cursor: string | null;
 }
 
 export interface SingleSessionResponse extends BaseResponse {
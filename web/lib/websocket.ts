@@ -11,11 +11,54 @@ export interface FinalPayload {
 	words: number;
 	duration_seconds: number;
 	language: string;
+	language_probability: number | null;
+	detection_seconds_saved: number;
 	model_used: string;
 	error?: string;
 }
 
-export type WebSocketMessage = PartialUpdate | FinalPayload;
+export interface SessionMessage {
+	type: "session";
+	session_id: string;
+	resume_token: string;
+}
+
+export interface ResumedMessage {
+	type: "resumed";
+	session_id: string;
+	text: string;
+}
+
+export interface QueuedMessage {
+	type: "queued";
+	position: number;
+}
+
+export interface UnavailableMessage {
+	type: "unavailable";
+	reason: string;
+	retry_after: number;
+}
+
+export type WebSocketMessage =
+	| PartialUpdate
+	| FinalPayload
+	| SessionMessage
+	| ResumedMessage
+	| QueuedMessage
+	| UnavailableMessage;
+
+const RESUME_ATTEMPTS = 5;
+const RESUME_DELAY_MS = 1000;
+
+class ConnectionClosedError extends Error {
+	code: number;
+
+	constructor(code: number) {
+		super("Connection closed");
+		this.code = code;
+	}
+}
 
 export class TranscriptionWebSocket {
 	private ws: WebSocket | null = null;
@@ -24,6 +67,13 @@ export class TranscriptionWebSocket {
 	private onPartial: ((text: string) => void) | null = null;
 	private onFinal: ((payload: FinalPayload) => void) | null = null;
 	private onError: ((error: string) => void) | null = null;
+	private onResumed: ((text: string) => void) | null = null;
+	private onQueued: ((position: number) => void) | null = null;
+	private resumeToken: string | null = null;
+	private pending: Blob[] = [];
+	private stopPending = false;
+	private closing = false;
+	private started = false;
 
 	constructor(token: string) {
 		this.token = token;
@@ -36,15 +86,30 @@ export class TranscriptionWebSocket {
 	}
 
 	connect(): Promise<void> {
+		return this.open(this.url);
+	}
+
+	private open(url: string): Promise<void> {
 		return new Promise((resolve, reject) => {
 			try {
-				this.ws = new WebSocket(this.url);
-
-				this.ws.onopen = () => {
+				const ws = new WebSocket(url);
+				this.ws = ws;
+				this.started = false;
+
+				// the server may hold the connection in line before it
+				// starts a session, so only resolve once one has started
+				const started = () => {
+					this.started = true;
+					this.pending.forEach((blob) => ws.send(blob));
+					this.pending = [];
+					if (this.stopPending) {
+						this.stopPending = false;
+						ws.send(JSON.stringify({ type: "stop" }));
+					}
 					resolve();
 				};
 
-				this.ws.onmessage = (event) => {
+				ws.onmessage = (event) => {
 					try {
 						const data: WebSocketMessage = JSON.parse(event.data);
 
@@ -54,31 +119,93 @@ export class TranscriptionWebSocket {
 							this.disconnect();
 						} else if (data.type === "partial") {
 							this.onPartial?.((data as PartialUpdate).partial);
+						} else if (data.type === "session") {
+							this.resumeToken = data.resume_token;
+							started();
+						} else if (data.type === "resumed") {
+							this.onResumed?.(data.text);
+							started();
+						} else if (data.type === "queued") {
+							this.onQueued?.(data.position);
+						} else if (data.type === "unavailable") {
+							reject(
+								new Error(
+									`${data.reason}, try again in ${data.retry_after}s`,
+								),
+							);
 						}
 					} catch (error) {}
 				};
 
-				this.ws.onerror = (error) => {
-					this.onError?.("Connection error");
+				ws.onerror = (error) => {
 					reject(error);
 				};
 
-				this.ws.onclose = () => {};
+				ws.onclose = (event) => {
+					if (this.ws !== ws || this.closing) {
+						return;
+					}
+					// a socket that never started a session is handled by
+					// whoever opened it, through the rejected promise
+					if (!this.started) {
+						reject(new ConnectionClosedError(event.code));
+						return;
+					}
+					// the server parks the session on an unexpected drop, so
+					// reconnect with the resume token and pick up from there
+					this.ws = null;
+					if (this.resumeToken && event.code !== 1008) {
+						this.resume(RESUME_ATTEMPTS);
+					} else {
+						this.fail();
+					}
+				};
 			} catch (error) {
 				reject(error);
 			}
 		});
 	}
 
+	private resume(attempts: number): void {
+		setTimeout(() => {
+			if (this.closing) {
+				return;
+			}
+			const url = `${this.url}&resume=${this.resumeToken}`;
+			this.open(url).catch((error) => {
+				if (this.closing) {
+					return;
+				}
+				const refused =
+					error instanceof ConnectionClosedError && error.code === 1008;
+				if (attempts > 1 && !refused) {
+					this.resume(attempts - 1);
+				} else {
+					this.fail();
+				}
+			});
+		}, RESUME_DELAY_MS);
+	}
+
+	private fail(): void {
+		this.disconnect();
+		this.onError?.("Connection error");
+	}
+
 	sendAudio(audioData: Blob): void {
-		if (this.ws && this.ws.readyState === WebSocket.OPEN) {
+		if (this.ws && this.started && this.ws.readyState === WebSocket.OPEN) {
 			this.ws.send(audioData);
+		} else if (this.resumeToken && !this.closing) {
+			this.pending.push(audioData);
 		}
 	}
 
 	sendStopMessage(): void {
-		if (this.ws && this.ws.readyState === WebSocket.OPEN) {
+		if (this.ws && this.started && this.ws.readyState === WebSocket.OPEN) {
 			this.ws.send(JSON.stringify({ type: "stop" }));
+		} else if (this.resumeToken && !this.closing) {
+			// sent as soon as the session is resumed
+			this.stopPending = true;
 		}
 	}
 
@@ -90,11 +217,22 @@ export class TranscriptionWebSocket {
 		this.onFinal = callback;
 	}
 
+	setOnResumed(callback: (text: string) => void): void {
+		this.onResumed = callback;
+	}
+
+	setOnQueued(callback: (position: number) => void): void {
+		this.onQueued = callback;
+	}
+
 	setOnError(callback: (error: string) => void): void {
 		this.onError = callback;
 	}
 
 	disconnect(): void {
+		this.closing = true;
+		this.pending = [];
+		this.stopPending = false;
 		if (this.ws) {
 			this.ws.close();
 			this.ws = null;